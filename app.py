@@ -1,20 +1,160 @@
+import importlib
+import time
+
+import click
 from flask import Flask
 from flask_cors import CORS
-from routes.auth_routes import auth_bp
-from routes.hotel_routes import hotel_bp
-from routes.booking_routes import booking_bp
-from routes.property_route import property_bp
-# from routes.ai_routes import ai_bp
-from routes.ai_routes import ai_bp
-
-app = Flask(__name__)
-CORS(app)
-
-app.register_blueprint(auth_bp, url_prefix="/api/auth")
-app.register_blueprint(hotel_bp, url_prefix="/api")
-app.register_blueprint(booking_bp, url_prefix="/api")
-app.register_blueprint(property_bp, url_prefix="/api")
-app.register_blueprint(ai_bp, url_prefix="/api")
+from config import Config
+
+# name -> (module, blueprint attribute, url prefix). Only enabled blueprints
+# are imported, so a worker pays for just the routes it serves.
+BLUEPRINTS = {
+    "auth": ("routes.auth_routes", "auth_bp", "/api/auth"),
+    "hotels": ("routes.hotel_routes", "hotel_bp", "/api"),
+    "bookings": ("routes.booking_routes", "booking_bp", "/api"),
+    "properties": ("routes.property_route", "property_bp", "/api"),
+    "ai": ("routes.ai_routes", "ai_bp", "/api"),
+    "payments": ("routes.payment_routes", "payment_bp", "/api/payments"),
+}
+
+
+def create_app(config=None):
+    """Build the Flask app.
+
+    ``config`` defaults to ``Config.from_env()`` and is validated first.
+    Service clients (Supabase, OpenAI) are created on first use, not here.
+    """
+    started = time.perf_counter()
+    config = (config or Config.from_env()).validate()
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    CORS(app)
+
+    from services import instrumentation, resilience
+    from services.openai_client import OpenAIClient
+    from services.supabase_client import SupabaseClient
+    from utils import auth_guard, compression
+    from utils.json_provider import provider_class
+
+    app.json = provider_class(config.JSON_PROVIDER)(app)
+
+    SupabaseClient.configure(config.SUPABASE_URL, config.SUPABASE_KEY)
+    OpenAIClient.configure(config.OPENAI_API_KEY, config.OPENAI_BASE_URL)
+    auth_guard.configure(
+        config.SUPABASE_URL,
+        jwt_secret=config.SUPABASE_JWT_SECRET,
+        jwks_url=config.SUPABASE_JWKS_URL,
+        audience=config.SUPABASE_JWT_AUDIENCE,
+        verify_mode=config.AUTH_VERIFY_MODE,
+        remote_fallback=config.AUTH_REMOTE_FALLBACK,
+    )
+    instrumentation.init_app(app)
+    resilience.init_app(app)
+    compression.init_app(app)
+    if config.CATALOGUE_REPLICA:
+        from services.catalogue_replica import catalogue_replica
+
+        catalogue_replica.enable()
+
+    for name in config.ENABLED_BLUEPRINTS:
+        module, attribute, url_prefix = BLUEPRINTS[name]
+        blueprint = getattr(importlib.import_module(module), attribute)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+    for command in (rebuild_ratings, ingest_properties, geocode_properties):
+        app.cli.add_command(command)
+
+    startup_ms = (time.perf_counter() - started) * 1000
+    app.config["STARTUP_MS"] = round(startup_ms, 1)
+    if startup_ms > config.STARTUP_BUDGET_MS:
+        app.logger.warning(
+            "create_app took %.0fms, over the %.0fms startup budget",
+            startup_ms, config.STARTUP_BUDGET_MS,
+        )
+    return app
+
+
+@click.command("rebuild-ratings")
+def rebuild_ratings():
+    """Recompute per-property rating aggregates from the reviews table."""
+    from services import rating_summary
+
+    count = rating_summary.rebuild()
+    click.echo(f"Rebuilt rating aggregates for {count} properties")
+
+
+@click.command("ingest-properties")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--owner-id", required=True, help="User id that will own the listings.")
+@click.option("--format", "fmt", type=click.Choice(["jsonl", "csv"]), default=None)
+@click.option("--chunk-size", type=int, default=None)
+@click.option("--errors", "errors_path", default=None, help="Per-row error report (JSONL).")
+@click.option("--resume/--no-resume", default=True, help="Continue from the last checkpoint.")
+def ingest_properties(path, owner_id, fmt, chunk_size, errors_path, resume):
+    """Bulk-load properties from a JSONL or CSV file."""
+    import json
+    import os
+    from services import bulk_ingest
+
+    checkpoint_path = f"{path}.checkpoint"
+    errors_path = errors_path or f"{path}.errors.jsonl"
+    start_after = 0
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            start_after = int(f.read().strip() or 0)
+        click.echo(f"Resuming after row {start_after}")
+
+    def checkpoint(last_row, summary):
+        with open(checkpoint_path, "w") as f:
+            f.write(str(last_row))
+        click.echo(
+            f"rows {summary['last_row']}: {summary['written']} written, "
+            f"{summary['failed']} failed"
+        )
+
+    with open(path, encoding="utf-8", newline="") as source, \
+            open(errors_path, "a" if start_after else "w", encoding="utf-8") as report:
+        summary = bulk_ingest.ingest(
+            bulk_ingest.read_rows(source, fmt or bulk_ingest.detect_format(path)),
+            owner_id=owner_id,
+            chunk_size=chunk_size or bulk_ingest.INGEST_CHUNK_SIZE,
+            start_after=start_after,
+            on_error=lambda row, errs: report.write(json.dumps({"row": row, "errors": errs}) + "\n"),
+            on_chunk=checkpoint,
+        )
+
+    click.echo(
+        f"Done: {summary['processed']} processed, {summary['written']} written, "
+        f"{summary['failed']} failed (see {errors_path})"
+    )
+
+
+@click.command("geocode-properties")
+@click.option("--all", "refresh_all", is_flag=True, help="Re-geocode rows that already have coordinates.")
+def geocode_properties(refresh_all):
+    """Fill properties.latitude/longitude from the offline gazetteer."""
+    from services.geocoding import gazetteer
+    from services.queries import fetch_all
+    from services.supabase_client import supabase
+
+    def build_query():
+        query = supabase.table("properties").select("id, location").order("id")
+        return query if refresh_all else query.is_("latitude", "null")
+
+    updated, unmatched = 0, 0
+    for row in fetch_all(build_query):
+        coordinates = gazetteer.geocode(row.get("location"))
+        if coordinates is None:
+            unmatched += 1
+            continue
+        supabase.table("properties").update(
+            {"latitude": coordinates[0], "longitude": coordinates[1]}
+        ).eq("id", row["id"]).execute()
+        updated += 1
+    click.echo(f"Geocoded {updated} properties ({unmatched} locations not in the gazetteer)")
+
+app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)
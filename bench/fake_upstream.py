@@ -0,0 +1,621 @@
+"""Local stand-ins for Supabase (PostgREST + GoTrue) and OpenAI chat completions.
+
+Only the subset of each API that the app uses is implemented: PostgREST
+select with embedded resources, the filter operators emitted by
+postgrest-py, logic trees, ordering, limits/ranges, single-object responses,
+inserts/upserts, updates and RPCs; GoTrue's ``/user``; and OpenAI's
+``/chat/completions`` including streaming.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from bench.seed import CATEGORIES, FACILITIES, LOCATIONS
+
+JWT_SECRET = "bench-jwt-secret-with-at-least-32-characters"
+
+# (table, embedded name) -> (kind, foreign key column)
+#   "one":  parent[fk] == child["id"]
+#   "many": child[fk] == parent["id"]
+RELATIONS = {
+    ("properties", "property_images"): ("many", "property_id"),
+    ("properties", "reviews"): ("many", "property_id"),
+    ("properties", "property_facilities"): ("many", "property_id"),
+    ("properties", "bookings"): ("many", "property_id"),
+    ("properties", "category"): ("one", "category_id"),
+    ("property_facilities", "facilities"): ("one", "facility_id"),
+    ("property_facilities", "properties"): ("one", "property_id"),
+    ("property_images", "properties"): ("one", "property_id"),
+    ("reviews", "properties"): ("one", "property_id"),
+    ("bookings", "properties"): ("one", "property_id"),
+    ("payments", "bookings"): ("one", "booking_id"),
+}
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def make_jwt(claims, secret=JWT_SECRET):
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def read_jwt_claims(token):
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Tables whose updated_at is set by a default and an update trigger
+TOUCHED_TABLES = {"properties"}
+
+
+# ---------------------------------------------------------------- parsing
+
+
+def _split_top_level(text, sep=","):
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_select(text):
+    """``"a, b, rel(c, sub(d))"`` -> ``["a", "b", ("rel", ["c", ("sub", ["d"])])]``"""
+    items = []
+    for part in _split_top_level(text or "*"):
+        if "(" in part:
+            name, inner = part.split("(", 1)
+            name = name.split(":")[-1].split("!")[0].strip()
+            items.append((name, parse_select(inner[:-1])))
+        else:
+            items.append(part.split("::")[0])
+    return items
+
+
+def _unquote_value(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _coerce(row_value, raw):
+    if isinstance(row_value, bool):
+        return raw.lower() == "true"
+    if isinstance(row_value, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _compare(row_value, op, raw):
+    if op == "is":
+        return row_value is None if raw.lower() == "null" else row_value == (raw.lower() == "true")
+    if op == "in":
+        return str(row_value) in raw
+    if row_value is None:
+        return False
+    if op in ("like", "ilike"):
+        pattern = re.escape(raw).replace("%", ".*").replace(r"\*", ".*")
+        flags = re.IGNORECASE if op == "ilike" else 0
+        return re.fullmatch(pattern, str(row_value), flags) is not None
+    value = _coerce(row_value, raw)
+    left = float(row_value) if isinstance(value, float) else str(row_value)
+    return {
+        "eq": left == value,
+        "neq": left != value,
+        "gt": left > value,
+        "gte": left >= value,
+        "lt": left < value,
+        "lte": left <= value,
+    }[op]
+
+
+def _condition(column, expression):
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    raw = _unquote_value(raw)
+    if op == "in":
+        raw = {_unquote_value(v) for v in _split_top_level(raw.strip("()"))}
+
+    def check(row):
+        result = _compare(row.get(column), op, raw)
+        return not result if negate else result
+
+    return check
+
+
+def _logic_tree(kind, body):
+    checks = []
+    for item in _split_top_level(body):
+        match = re.match(r"^(not\.)?(and|or)\((.*)\)$", item)
+        if match:
+            nested = _logic_tree(match.group(2), match.group(3))
+            checks.append((lambda f: lambda row: not f(row))(nested) if match.group(1) else nested)
+        else:
+            column, _, expression = item.partition(".")
+            checks.append(_condition(column, expression))
+    if kind == "and":
+        return lambda row: all(check(row) for check in checks)
+    return lambda row: any(check(row) for check in checks)
+
+
+class Query:
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, params):
+        self.select = parse_select("*")
+        self.filters = []
+        self.order = []
+        self.limit = None
+        self.offset = 0
+        self.embedded_limits = {}
+        self.on_conflict = None
+        for key, value in params:
+            if key == "select":
+                self.select = parse_select(value)
+            elif key == "order":
+                for part in value.split(","):
+                    column, *modifiers = part.split(".")
+                    self.order.append((column, "desc" in modifiers))
+            elif key == "limit":
+                self.limit = int(value)
+            elif key == "offset":
+                self.offset = int(value)
+            elif key == "on_conflict":
+                self.on_conflict = value
+            elif key.endswith(".limit"):
+                self.embedded_limits[key[: -len(".limit")]] = int(value)
+            elif key in ("or", "and"):
+                self.filters.append(_logic_tree(key, value.strip()[1:-1]))
+            elif key in ("not.or", "not.and"):
+                tree = _logic_tree(key[4:], value.strip()[1:-1])
+                self.filters.append(lambda row, tree=tree: not tree(row))
+            elif key not in self.RESERVED and "." not in key:
+                self.filters.append(_condition(key, value))
+
+    def matches(self, row):
+        return all(check(row) for check in self.filters)
+
+
+# ---------------------------------------------------------------- database
+
+
+def _sort_key(value):
+    if value is None:
+        return (1, 0)
+    return (0, value if isinstance(value, (int, float)) else str(value))
+
+
+class FakeDatabase:
+    def __init__(self, tables):
+        self.tables = {name: list(rows) for name, rows in tables.items()}
+        self.lock = threading.RLock()
+        self.rpcs = {
+            "rebuild_property_rating_summary": self._rebuild_rating_summary,
+            "create_booking": self._create_booking,
+            "process_booking_payment": self._process_booking_payment,
+        }
+
+    def _view(self, name):
+        if name == "review_with_user_email":
+            emails = {user["id"]: user["email"] for user in self.tables["users"]}
+            return [
+                {**review, "user_email": emails.get(review.get("user_id"))}
+                for review in self.tables["reviews"]
+            ]
+        if name == "property_rating_summary":
+            totals = {}
+            for review in self.tables["reviews"]:
+                if review.get("rating") is None:
+                    continue
+                total, count = totals.get(review["property_id"], (0, 0))
+                totals[review["property_id"]] = (total + review["rating"], count + 1)
+            latest = {}
+            for review in self.tables["reviews"]:
+                latest[review["property_id"]] = max(latest.get(review["property_id"], ""), review.get("created_at") or "")
+            return [
+                {"property_id": pid, "rating_sum": total, "review_count": count, "updated_at": latest[pid]}
+                for pid, (total, count) in totals.items()
+            ]
+        return self.tables.setdefault(name, [])
+
+    def _rebuild_rating_summary(self, params):
+        return len(self._view("property_rating_summary"))
+
+    def _append(self, table, row):
+        row = {"id": str(uuid.uuid4()), "created_at": _now(), **row}
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    def _idempotent(self, scope, owner, params, write):
+        """Mirror of the idempotency_keys handling in the booking RPCs."""
+        key = params.get("p_idempotency_key")
+        keys = self.tables.setdefault("idempotency_keys", [])
+        if key is not None:
+            for stored in keys:
+                if (stored["scope"], stored["owner"], stored["key"]) == (scope, owner, key):
+                    if stored["request_hash"] != params.get("p_request_hash"):
+                        return {"status": "key_mismatch"}
+                    return {**stored["response"], "status": "replayed"}
+        result = write()
+        if "status" in result:
+            return result
+        if key is not None:
+            keys.append({
+                "scope": scope, "owner": owner, "key": key,
+                "request_hash": params.get("p_request_hash"), "response": result,
+            })
+        return {**result, "status": "created"}
+
+    def _create_booking(self, params):
+        def write():
+            for booking in self.tables.setdefault("bookings", []):
+                if (
+                    booking.get("property_id") == params["p_property_id"]
+                    and (booking.get("status") or "").lower() not in ("cancelled", "canceled", "refunded")
+                    and booking["check_in"] < params["p_check_out"]
+                    and booking["check_out"] > params["p_check_in"]
+                ):
+                    return {"status": "conflict"}
+            method = params.get("p_payment_method")
+            booking = self._append("bookings", {
+                "user_id": params["p_user_id"],
+                "property_id": params["p_property_id"],
+                "check_in": params["p_check_in"],
+                "check_out": params["p_check_out"],
+                "guests": params["p_guests"],
+                "amount_paid": params["p_amount_paid"],
+                "payment_status": "paid",
+                "status": "confirmed" if method else None,
+                "payment_date": _now() if method else None,
+            })
+            payment = None
+            if method:
+                payment = self._append("payments", {
+                    "booking_id": booking["id"], "amount": params["p_amount_paid"],
+                    "method": method, "status": "completed",
+                })
+            return {"booking": dict(booking), "payment": payment and dict(payment)}
+
+        return self._idempotent("book", params["p_user_id"], params, write)
+
+    def _process_booking_payment(self, params):
+        def write():
+            booking = next(
+                (
+                    b for b in self.tables.setdefault("bookings", [])
+                    if b["id"] == params["p_booking_id"] and b.get("user_id") == params["p_user_id"]
+                ),
+                None,
+            )
+            if booking is None:
+                return {"status": "not_found"}
+            booking.update({"status": "confirmed", "payment_status": "paid", "payment_date": _now()})
+            payment = self._append("payments", {
+                "booking_id": booking["id"], "amount": params["p_amount"],
+                "method": params["p_payment_method"], "status": "completed",
+            })
+            return {"booking": dict(booking), "payment": dict(payment)}
+
+        return self._idempotent("payment", params["p_user_id"], params, write)
+
+    def _embed(self, table, row, name, select, path, limits):
+        kind, fk = RELATIONS.get((table, name), (None, None))
+        if kind is None:
+            return None
+        if kind == "one":
+            target = next((r for r in self._view(name) if r.get("id") == row.get(fk)), None)
+            return self._project(name, target, select, path, limits) if target else None
+        children = [r for r in self._view(name) if r.get(fk) == row.get("id")]
+        if path in limits:
+            children = children[: limits[path]]
+        return [self._project(name, child, select, path, limits) for child in children]
+
+    def _project(self, table, row, select, path="", limits=None):
+        limits = limits or {}
+        result = {}
+        for item in select:
+            if isinstance(item, tuple):
+                name, sub_select = item
+                sub_path = f"{path}.{name}" if path else name
+                result[name] = self._embed(table, row, name, sub_select, sub_path, limits)
+            elif item == "*":
+                result.update(row)
+            else:
+                result[item] = row.get(item)
+        return result
+
+    def select(self, table, query):
+        with self.lock:
+            rows = [row for row in self._view(table) if query.matches(row)]
+            for column, desc in reversed(query.order):
+                rows.sort(key=lambda r: _sort_key(r.get(column)), reverse=desc)
+            end = None if query.limit is None else query.offset + query.limit
+            rows = rows[query.offset:end]
+            return [self._project(table, row, query.select, limits=query.embedded_limits) for row in rows]
+
+    def insert(self, table, rows, query, resolution=None):
+        with self.lock:
+            stored = self.tables.setdefault(table, [])
+            key = query.on_conflict or "id"
+            existing = {row.get(key): row for row in stored}
+            written = []
+            for row in rows:
+                row = {"id": str(uuid.uuid4()), "created_at": _now(), **row}
+                if table in TOUCHED_TABLES:
+                    row.setdefault("updated_at", _now())
+                current = existing.get(row.get(key))
+                if current is not None:
+                    if resolution == "ignore-duplicates":
+                        continue
+                    if resolution == "merge-duplicates":
+                        current.update(row)
+                        written.append(current)
+                        continue
+                    raise ValueError(f"duplicate key value violates unique constraint on {key}")
+                stored.append(row)
+                existing[row.get(key)] = row
+                written.append(row)
+            return written
+
+    def update(self, table, values, query):
+        with self.lock:
+            updated = []
+            for row in self.tables.setdefault(table, []):
+                if query.matches(row):
+                    row.update({k: (_now() if v == "now()" else v) for k, v in values.items()})
+                    if table in TOUCHED_TABLES:
+                        row["updated_at"] = _now()
+                    updated.append(row)
+            return updated
+
+    def rpc(self, name, params):
+        with self.lock:
+            if name not in self.rpcs:
+                raise KeyError(name)
+            return self.rpcs[name](params)
+
+
+# ---------------------------------------------------------------- openai
+
+
+def _fake_filters(query):
+    text = query.lower()
+    filters = {}
+    for location in LOCATIONS:
+        if location.lower() in text:
+            filters["location"] = location
+    for category in CATEGORIES:
+        if category.lower() in text:
+            filters["category"] = category
+    must_have = [f.lower() for f in FACILITIES if f.lower() in text]
+    if must_have:
+        filters["must_have"] = must_have
+    if numbers := [int(n) for n in re.findall(r"\d{3,}", text)]:
+        filters["max_price"] = max(numbers)
+    return filters
+
+
+def _completion(content, model, stream=False):
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "created": int(time.time()),
+        "model": model,
+    }
+    if not stream:
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150},
+        }
+    pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+    chunks = [
+        {**base, "object": "chat.completion.chunk",
+         "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}]}
+        for piece in pieces
+    ]
+    chunks.append({**base, "object": "chat.completion.chunk",
+                   "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    return chunks
+
+
+# ---------------------------------------------------------------- server
+
+
+class UpstreamState:
+    def __init__(self, db, db_latency=0.002, llm_latency=0.8, db_error_rate=0.0, llm_error_rate=0.0):
+        self.db = db
+        self.db_latency = db_latency
+        self.llm_latency = llm_latency
+        # Fraction of calls answered 503, to exercise breakers and retries
+        self.db_error_rate = db_error_rate
+        self.llm_error_rate = llm_error_rate
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, service):
+        with self._lock:
+            self._counts[service] = self._counts.get(service, 0) + 1
+
+    def reset_counts(self):
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null") if length else None
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method):
+        url = urlsplit(self.path)
+        params = parse_qsl(url.query, keep_blank_values=True)
+        path = unquote(url.path)
+        try:
+            if path.startswith("/rest/v1/"):
+                self.state.count("supabase")
+                time.sleep(self.state.db_latency)
+                if random.random() < self.state.db_error_rate:
+                    self._body()  # drain it so the keep-alive connection stays usable
+                    return self._send(503, {"message": "Service Unavailable"})
+                return self._postgrest(method, path[len("/rest/v1/"):], params)
+            if path.startswith("/auth/v1/"):
+                self.state.count("supabase")
+                time.sleep(self.state.db_latency)
+                return self._gotrue(method, path[len("/auth/v1/"):])
+            if path.rstrip("/").endswith("/chat/completions"):
+                self.state.count("openai")
+                if random.random() < self.state.llm_error_rate:
+                    self._body()
+                    return self._send(503, {"error": {"message": "Service Unavailable"}})
+                return self._openai()
+            self._send(404, {"message": f"Unknown path {path}"})
+        except (KeyError, ValueError) as e:
+            self._send(400, {"code": "PGRST100", "message": str(e), "details": None, "hint": None})
+
+    def _postgrest(self, method, resource, params):
+        db = self.state.db
+        query = Query(params)
+        if range_header := self.headers.get("Range"):
+            start, _, end = range_header.partition("-")
+            query.offset, query.limit = int(start), int(end) - int(start) + 1
+
+        if resource.startswith("rpc/"):
+            return self._send(200, db.rpc(resource[4:], self._body() or {}))
+
+        prefer = self.headers.get("Prefer", "")
+        if method == "GET":
+            rows = db.select(resource, query)
+        elif method == "POST":
+            body = self._body()
+            resolution = re.search(r"resolution=([\w-]+)", prefer)
+            rows = db.insert(resource, body if isinstance(body, list) else [body], query,
+                             resolution.group(1) if resolution else None)
+        elif method == "PATCH":
+            rows = db.update(resource, self._body() or {}, query)
+        else:
+            return self._send(405, {"message": "Method not allowed"})
+
+        if "application/vnd.pgrst.object+json" in self.headers.get("Accept", ""):
+            if len(rows) != 1:
+                return self._send(406, {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(rows)} rows",
+                    "hint": None,
+                })
+            return self._send(200, rows[0])
+        status = 201 if method == "POST" else 200
+        return self._send(status, rows, {"Content-Range": f"0-{max(len(rows) - 1, 0)}/*"})
+
+    def _gotrue(self, method, resource):
+        if resource.rstrip("/") == "user" and method in ("GET", "PUT"):
+            token = (self.headers.get("Authorization") or "").partition(" ")[2]
+            claims = read_jwt_claims(token)
+            changes = (self._body() or {}) if method == "PUT" else {}
+            return self._send(200, {
+                "id": claims["sub"],
+                "aud": claims.get("aud", "authenticated"),
+                "role": claims.get("role", "authenticated"),
+                "email": changes.get("email", claims.get("email")),
+                "app_metadata": {},
+                "user_metadata": changes.get("data", {}),
+                "created_at": "2026-01-01T00:00:00+00:00",
+            })
+        return self._send(404, {"msg": f"Unsupported auth endpoint {resource}"})
+
+    def _openai(self):
+        body = self._body() or {}
+        time.sleep(self.state.llm_latency)
+        query = next((m["content"] for m in reversed(body.get("messages", [])) if m["role"] == "user"), "")
+        content = json.dumps(_fake_filters(query))
+        model = body.get("model", "gpt-4-turbo")
+        if not body.get("stream"):
+            return self._send(200, _completion(content, model))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for chunk in _completion(content, model, stream=True):
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+
+def start_server(state, host="127.0.0.1", port=0):
+    """Serve ``state`` on a background thread; returns ``(server, base_url)``."""
+    handler = type("BoundHandler", (Handler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,274 @@
+"""Benchmark the API routes against local Supabase and OpenAI stand-ins.
+
+Run a benchmark and save the results::
+
+    python -m bench.run --properties 2000 --concurrency 16 --requests 400 --output after.json
+
+Compare two saved runs (exits non-zero when a metric regresses by more
+than the threshold)::
+
+    python -m bench.run --compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from bench.fake_upstream import JWT_SECRET, FakeDatabase, UpstreamState, make_jwt, start_server
+from bench.seed import build_dataset
+
+AI_QUERIES = [
+    "villa in Nairobi with pool",
+    "apartment in Mombasa under 8000",
+    "anywhere with wifi and parking",
+    "cottage near Naivasha with kitchen",
+    "a romantic cabin for a quiet weekend with a hot tub",
+    "family house close to the beach in Diani, pet friendly please",
+    "cheap studio for a work trip with a good workspace",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Client:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        return status, time.perf_counter() - started, len(payload)
+
+
+def build_scenarios(dataset, tokens, rng):
+    property_ids = [p["id"] for p in dataset["properties"]]
+    users = list(tokens.items())
+    lock = threading.Lock()
+
+    def pick(seq):
+        with lock:
+            return rng.choice(seq)
+
+    def booking_body():
+        with lock:
+            start = date.today() + timedelta(days=rng.randint(200, 900))
+            nights = rng.randint(1, 5)
+        return {
+            "property_id": pick(property_ids),
+            "check_in": start.isoformat(),
+            "check_out": (start + timedelta(days=nights)).isoformat(),
+            "guests": 2,
+            "amount_paid": 10000,
+        }
+
+    def booking_history():
+        user_id, token = pick(users)
+        return "GET", f"/api/bookings/{user_id}", None, token
+
+    return {
+        "list_properties": lambda: ("GET", "/api/properties", None, None),
+        "property_detail": lambda: ("GET", f"/api/properties/{pick(property_ids)}", None, None),
+        "ai_recommendations": lambda: ("POST", "/api/ai-recommendations", {"query": pick(AI_QUERIES)}, None),
+        "book": lambda: ("POST", "/api/book", booking_body(), pick(users)[1]),
+        "booking_history": booking_history,
+    }
+
+
+def run_scenario(client, state, make_request, total, concurrency):
+    state.reset_counts()
+    latencies, statuses, sizes = [], {}, []
+    lock = threading.Lock()
+
+    def one(_):
+        method, path, body, token = make_request()
+        status, elapsed, size = client.request(method, path, body, token)
+        with lock:
+            latencies.append(elapsed)
+            sizes.append(size)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+    upstream = state.reset_counts()
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(total / wall, 2),
+        "avg_response_bytes": round(sum(sizes) / len(sizes)),
+        "upstream_calls_per_request": {
+            service: round(count / total, 2) for service, count in sorted(upstream.items())
+        },
+        "statuses": statuses,
+    }
+
+
+def start_app(base_url, warm_cache):
+    os.environ.update({
+        "SUPABASE_URL": base_url,
+        "SUPABASE_KEY": make_jwt({"role": "anon", "iss": "supabase"}),
+        "SUPABASE_JWT_SECRET": JWT_SECRET,
+        "AUTH_VERIFY_MODE": "local",
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+    })
+    if not warm_cache:
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    dataset = build_dataset(
+        properties=args.properties,
+        reviews_per_property=args.reviews_per_property,
+        bookings=args.bookings,
+        users=args.users,
+        seed=args.seed,
+    )
+    state = UpstreamState(
+        FakeDatabase(dataset),
+        db_latency=args.db_latency_ms / 1000,
+        llm_latency=args.llm_latency_ms / 1000,
+    )
+    _, upstream_url = start_server(state)
+    _, app_url = start_app(upstream_url, args.warm_cache)
+    client = Client(app_url)
+
+    expires = int(time.time()) + 3600
+    tokens = {
+        user["id"]: make_jwt({
+            "sub": user["id"], "email": user["email"], "aud": "authenticated",
+            "role": "authenticated", "exp": expires,
+        })
+        for user in dataset["users"]
+    }
+    scenarios = build_scenarios(dataset, tokens, rng)
+    selected = args.routes.split(",") if args.routes else list(scenarios)
+
+    results = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "scenarios": {},
+    }
+    for name in selected:
+        # One untimed request so lazy caches and connections are warm.
+        client.request(*scenarios[name]())
+        results["scenarios"][name] = run_scenario(
+            client, state, scenarios[name], args.requests, args.concurrency
+        )
+        print_result(name, results["scenarios"][name])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def print_result(name, result):
+    calls = ", ".join(f"{k}={v}" for k, v in result["upstream_calls_per_request"].items()) or "none"
+    print(
+        f"{name:<20} p50={result['p50_ms']:>8.1f}ms p95={result['p95_ms']:>8.1f}ms "
+        f"p99={result['p99_ms']:>8.1f}ms {result['throughput_rps']:>8.1f} req/s "
+        f"upstream/req: {calls} statuses: {result['statuses']}"
+    )
+
+
+def compare(before_path, after_path, threshold):
+    with open(before_path) as f:
+        before = json.load(f)["scenarios"]
+    with open(after_path) as f:
+        after = json.load(f)["scenarios"]
+
+    regressions = []
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        rows = [(metric, old[metric], new[metric], True) for metric in ("p50_ms", "p95_ms", "p99_ms")]
+        rows.append(("throughput_rps", old["throughput_rps"], new["throughput_rps"], False))
+        for service in sorted(set(old["upstream_calls_per_request"]) | set(new["upstream_calls_per_request"])):
+            rows.append((
+                f"{service}_calls",
+                old["upstream_calls_per_request"].get(service, 0),
+                new["upstream_calls_per_request"].get(service, 0),
+                True,
+            ))
+
+        print(name)
+        for metric, old_value, new_value, lower_is_better in rows:
+            change = (new_value - old_value) / old_value if old_value else (1.0 if new_value else 0.0)
+            worse = change > threshold if lower_is_better else change < -threshold
+            flag = "REGRESSION" if worse else ""
+            print(f"  {metric:<18} {old_value:>10} -> {new_value:>10} ({change:+.1%}) {flag}")
+            if worse:
+                regressions.append(f"{name}.{metric}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=500)
+    parser.add_argument("--reviews-per-property", type=int, default=10)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="Added to every fake Supabase call.")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Fake chat-completions latency.")
+    parser.add_argument("--routes", help="Comma-separated subset of scenarios to run.")
+    parser.add_argument("--warm-cache", action="store_true", help="Leave the HTTP response cache enabled.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative change.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Measure search index build time and query latency on a synthetic catalogue.
+
+    python -m bench.search --properties 100000 --target-ms 50
+
+Exits non-zero when the p95 latency of any query kind exceeds the target.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from bench.run import percentile
+from bench.seed import ADJECTIVES, CATEGORIES, LOCATIONS, NOUNS, build_dataset
+from services.search_index import SearchIndex
+
+
+def build_queries(rng, count):
+    kinds = {
+        "single_term": lambda: rng.choice(LOCATIONS),
+        "multi_term": lambda: f"{rng.choice(ADJECTIVES)} {rng.choice(CATEGORIES)} {rng.choice(LOCATIONS)}",
+        "typo": lambda: rng.choice(LOCATIONS)[:-1] + "x",
+        "prefix": lambda: rng.choice(NOUNS)[:3],
+    }
+    return {kind: [make() for _ in range(count)] for kind, make in kinds.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per kind.")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="p95 latency budget per query.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rows = build_dataset(
+        properties=args.properties, images_per_property=0, reviews_per_property=0,
+        bookings=0, users=10, hotels=0, seed=args.seed,
+    )["properties"]
+
+    index = SearchIndex(ttl=float("inf"))
+    started = time.perf_counter()
+    index.load(rows)
+    print(f"indexed {len(rows)} listings in {time.perf_counter() - started:.2f}s")
+
+    failed = False
+    for kind, queries in build_queries(random.Random(args.seed), args.queries).items():
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            if kind == "prefix":
+                index.suggest(query)
+            else:
+                index.search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        p95 = percentile(latencies, 95)
+        failed = failed or p95 > args.target_ms
+        print(f"{kind:<12} p50={percentile(latencies, 50):7.2f}ms p95={p95:7.2f}ms")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
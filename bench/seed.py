@@ -0,0 +1,123 @@
+"""Synthetic catalogue used by the fake Supabase server."""
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from services.geocoding import gazetteer
+
+LOCATIONS = [
+    "Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Naivasha", "Malindi",
+    "Diani", "Lamu", "Nanyuki", "Watamu", "Thika", "Kilifi", "Nyeri", "Narok",
+]
+CATEGORIES = ["Apartment", "Villa", "Cottage", "House", "Studio", "Cabin"]
+FACILITIES = [
+    "WiFi", "Pool", "Parking", "Air Conditioning", "Kitchen", "Gym", "Hot Tub",
+    "Beach Access", "Workspace", "Washer", "Breakfast", "Pet Friendly",
+]
+ADJECTIVES = ["Cozy", "Modern", "Spacious", "Quiet", "Sunny", "Rustic", "Luxury", "Charming"]
+NOUNS = ["Retreat", "Hideaway", "Loft", "Escape", "Haven", "Nest", "Getaway", "Suite"]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def build_dataset(properties=500, images_per_property=4, reviews_per_property=10,
+                  bookings=2000, users=50, hotels=100, seed=42):
+    """Return ``{table_name: [rows]}`` for a catalogue of the given scale."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    today = date.today()
+
+    user_rows = [
+        {"id": _uuid(rng), "email": f"user{i}@bench.local", "role": "authenticated"}
+        for i in range(users)
+    ]
+    category_rows = [{"id": i + 1, "name": name} for i, name in enumerate(CATEGORIES)]
+    facility_rows = [{"id": i + 1, "name": name} for i, name in enumerate(FACILITIES)]
+
+    property_rows, image_rows, review_rows, link_rows = [], [], [], []
+    for i in range(properties):
+        property_id = _uuid(rng)
+        location = rng.choice(LOCATIONS)
+        category = rng.choice(category_rows)
+        latitude, longitude = gazetteer.geocode(location)
+        property_rows.append({
+            "id": property_id,
+            "title": f"{rng.choice(ADJECTIVES)} {category['name']} {rng.choice(NOUNS)} in {location}",
+            "description": f"A {category['name'].lower()} stay in {location} close to the best sights.",
+            "location": location,
+            "category_id": category["id"],
+            "price_per_night": rng.randrange(1500, 40000, 500),
+            "rating": 0,
+            "review_count": 0,
+            "main_image_url": None if i % 3 == 0 else f"https://img.bench.local/{property_id}/main.jpg",
+            # Scattered within roughly 10km of the town centre
+            "latitude": round(latitude + rng.uniform(-0.09, 0.09), 5),
+            "longitude": round(longitude + rng.uniform(-0.09, 0.09), 5),
+            "owner_id": rng.choice(user_rows)["id"],
+            "created_at": (now - timedelta(minutes=i * 7)).isoformat(),
+            "updated_at": (now - timedelta(minutes=i * 7)).isoformat(),
+        })
+        for n in range(images_per_property):
+            image_rows.append({
+                "id": _uuid(rng),
+                "property_id": property_id,
+                "image_url": f"https://img.bench.local/{property_id}/{n}.jpg",
+            })
+        for n in range(rng.randint(0, reviews_per_property * 2)):
+            user = rng.choice(user_rows)
+            review_rows.append({
+                "id": _uuid(rng),
+                "property_id": property_id,
+                "user_id": user["id"],
+                "rating": rng.randint(1, 5),
+                "review_text": "Lovely stay." if n % 2 else "Would book again.",
+                "created_at": (now - timedelta(hours=n)).isoformat(),
+            })
+        for facility in rng.sample(facility_rows, rng.randint(2, 7)):
+            link_rows.append({
+                "id": _uuid(rng),
+                "property_id": property_id,
+                "facility_id": facility["id"],
+            })
+
+    booking_rows = []
+    for i in range(bookings):
+        start = today + timedelta(days=rng.randint(-60, 180))
+        booking_rows.append({
+            "id": _uuid(rng),
+            "user_id": rng.choice(user_rows)["id"],
+            "property_id": rng.choice(property_rows)["id"],
+            "check_in": start.isoformat(),
+            "check_out": (start + timedelta(days=rng.randint(1, 7))).isoformat(),
+            "guests": rng.randint(1, 6),
+            "payment_status": rng.choice(["paid", "pending"]),
+            "status": "confirmed",
+            "amount_paid": rng.randrange(3000, 90000, 500),
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+        })
+
+    hotel_rows = [
+        {
+            "id": _uuid(rng),
+            "name": f"{rng.choice(ADJECTIVES)} Hotel {i}",
+            "location": rng.choice(LOCATIONS),
+            "created_at": (now - timedelta(hours=i)).isoformat(),
+        }
+        for i in range(hotels)
+    ]
+
+    return {
+        "users": user_rows,
+        "category": category_rows,
+        "facilities": facility_rows,
+        "properties": property_rows,
+        "property_images": image_rows,
+        "reviews": review_rows,
+        "property_facilities": link_rows,
+        "bookings": booking_rows,
+        "hotels": hotel_rows,
+        "payments": [],
+    }
@@ -0,0 +1,93 @@
+"""Compare JSON encode time and bytes on the wire for listing payloads.
+
+    python -m bench.serialization --properties 5000
+
+Encodes the same payloads with Flask's default provider and the orjson
+provider, then reports the body size as identity, gzip and brotli (when
+installed), for full rows, listing cards and a ``fields=`` projection.
+"""
+
+import argparse
+import gzip
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from bench.run import percentile
+from bench.seed import build_dataset
+from utils import compression
+from utils.json_provider import OrjsonProvider, orjson
+
+PROJECTION = ("id", "title", "price_per_night", "thumbnail")
+
+
+def cards_for(rows):
+    # Same shape as services.enrichment.enrich_properties, without lookups
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "location": row["location"],
+            "category": row.get("category_id"),
+            "price_per_night": row["price_per_night"],
+            "thumbnail": row.get("main_image_url"),
+            "average_rating": 4.2,
+        }
+        for row in rows
+    ]
+
+
+def time_encode(provider, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = provider.response(payload).get_data()
+        timings.append((time.perf_counter() - started) * 1000)
+    return body, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rows = build_dataset(
+        properties=args.properties, images_per_property=0, reviews_per_property=0,
+        bookings=0, users=10, hotels=0, seed=args.seed,
+    )["properties"]
+    cards = cards_for(rows)
+    payloads = {
+        "rows": rows,
+        "cards": cards,
+        "projected": [{field: card[field] for field in PROJECTION} for card in cards],
+    }
+
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+    else:
+        print("orjson not installed; only the stdlib provider is measured")
+
+    print(f"{args.properties} listings, {args.repeat} runs each")
+    with app.app_context():
+        for name, payload in payloads.items():
+            for provider_name, provider in providers.items():
+                body, timings = time_encode(provider, payload, args.repeat)
+                print(
+                    f"{name:<10} {provider_name:<7} p50={percentile(timings, 50):7.2f}ms "
+                    f"p95={percentile(timings, 95):7.2f}ms"
+                )
+            sizes = [f"identity={len(body)}", f"gzip={len(gzip.compress(body, compression.COMPRESS_GZIP_LEVEL))}"]
+            if compression.brotli is not None:
+                sizes.append(f"br={len(compression.brotli.compress(body, quality=compression.COMPRESS_BROTLI_QUALITY))}")
+            print(f"{name:<10} bytes   {' '.join(sizes)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
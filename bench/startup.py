@@ -0,0 +1,77 @@
+"""Check app startup against an import-time budget.
+
+    python -m bench.startup --budget-ms 400
+
+Starts a fresh interpreter that imports ``app`` (which calls
+``create_app()``) and reports the wall time, the slowest imports, and
+whether the heavyweight client libraries stayed unloaded. Exits non-zero when the budget is
+exceeded or one of those libraries was imported at startup.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Only needed once a request uses them; must not load at startup.
+DEFERRED_MODULES = ("openai", "supabase", "postgrest", "pydantic", "numpy")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+print(json.dumps({
+    "total_ms": (time.perf_counter() - started) * 1000,
+    "create_app_ms": app.app.config["STARTUP_MS"],
+    "loaded": sorted(name for name in sys.modules if name.split(".")[0] in %r),
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def parse_importtime(stderr, max_depth=2):
+    """Return ``[(cumulative_us, module)]`` for imports nested at most ``max_depth`` deep."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if 0 < depth <= max_depth and name.strip() != "app":
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Budget for imports plus create_app().")
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list.")
+    args = parser.parse_args(argv)
+
+    env = {
+        "SUPABASE_URL": "http://127.0.0.1:54321",
+        "SUPABASE_KEY": "startup-check",
+        "SUPABASE_JWT_SECRET": "startup-check",
+        **os.environ,
+    }
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=root, env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    print(f"startup {report['total_ms']:.1f}ms (create_app {report['create_app_ms']:.1f}ms), budget {args.budget_ms:.0f}ms")
+    print("slowest imports:")
+    for cumulative, name in parse_importtime(result.stderr)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = report["total_ms"] > args.budget_ms
+    if report["loaded"]:
+        print(f"loaded at startup but should be deferred: {', '.join(report['loaded'])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,113 @@
 import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
 from dotenv import load_dotenv
 
-load_dotenv()
+BLUEPRINT_NAMES = ("auth", "hotels", "bookings", "properties", "ai", "payments")
+JSON_PROVIDERS = ("auto", "orjson", "stdlib")
+AUTH_VERIFY_MODES = ("local", "remote")
+
+
+class ConfigError(ValueError):
+    pass
+
 
+def _float(env, name, default):
+    value = env.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {value!r}")
+
+
+@dataclass(frozen=True)
 class Config:
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    SECRET_KEY = os.getenv("FLASK_SECRET_KEY")
-    OPENAI_API_KEY=your_openai_key_here
+    SUPABASE_URL: Optional[str] = None
+    SUPABASE_KEY: Optional[str] = None
+    SECRET_KEY: Optional[str] = None
+    # Optional: without it the AI routes answer 503 for queries the local
+    # filter parser cannot handle, instead of the app failing to start.
+    OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None
+    ENABLED_BLUEPRINTS: Tuple[str, ...] = BLUEPRINT_NAMES
+    STARTUP_BUDGET_MS: float = 250.0
+    # "auto" uses orjson when it is installed
+    JSON_PROVIDER: str = "auto"
+    # Serve catalogue reads from an in-memory replica (needs numpy)
+    CATALOGUE_REPLICA: bool = False
+    # "local" verifies JWTs in-process, "remote" asks GoTrue on every cache
+    # miss. Local HS256 tokens need the secret; asymmetric ones use the JWKS
+    # (SUPABASE_URL's by default).
+    AUTH_VERIFY_MODE: str = "local"
+    AUTH_REMOTE_FALLBACK: bool = False
+    SUPABASE_JWT_SECRET: Optional[str] = None
+    SUPABASE_JWKS_URL: Optional[str] = None
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+
+    @classmethod
+    def from_env(cls, env=None):
+        """Read the config from ``env`` (default: os.environ after loading .env)."""
+        if env is None:
+            load_dotenv()
+            env = os.environ
+        blueprints = env.get("ENABLED_BLUEPRINTS")
+        return cls(
+            SUPABASE_URL=env.get("SUPABASE_URL"),
+            SUPABASE_KEY=env.get("SUPABASE_KEY"),
+            SECRET_KEY=env.get("FLASK_SECRET_KEY"),
+            OPENAI_API_KEY=env.get("OPENAI_API_KEY") or None,
+            OPENAI_BASE_URL=env.get("OPENAI_BASE_URL") or None,
+            ENABLED_BLUEPRINTS=(
+                tuple(name.strip() for name in blueprints.split(",") if name.strip())
+                if blueprints is not None else BLUEPRINT_NAMES
+            ),
+            STARTUP_BUDGET_MS=_float(env, "STARTUP_BUDGET_MS", cls.STARTUP_BUDGET_MS),
+            JSON_PROVIDER=(env.get("JSON_PROVIDER") or cls.JSON_PROVIDER).lower(),
+            CATALOGUE_REPLICA=(env.get("CATALOGUE_REPLICA") or "").lower() in ("1", "true", "yes"),
+            AUTH_VERIFY_MODE=(env.get("AUTH_VERIFY_MODE") or cls.AUTH_VERIFY_MODE).lower(),
+            AUTH_REMOTE_FALLBACK=(env.get("AUTH_REMOTE_FALLBACK") or "").lower() in ("1", "true", "yes"),
+            SUPABASE_JWT_SECRET=env.get("SUPABASE_JWT_SECRET") or None,
+            SUPABASE_JWKS_URL=env.get("SUPABASE_JWKS_URL") or None,
+            SUPABASE_JWT_AUDIENCE=env.get("SUPABASE_JWT_AUDIENCE") or cls.SUPABASE_JWT_AUDIENCE,
+        )
+
+    def validate(self):
+        errors = []
+        unknown = sorted(set(self.ENABLED_BLUEPRINTS) - set(BLUEPRINT_NAMES))
+        if unknown:
+            errors.append(
+                f"ENABLED_BLUEPRINTS has unknown names {', '.join(unknown)} "
+                f"(choose from {', '.join(BLUEPRINT_NAMES)})"
+            )
+        # Every blueprint reads from Supabase
+        if self.ENABLED_BLUEPRINTS:
+            if not self.SUPABASE_URL:
+                errors.append("SUPABASE_URL is required")
+            else:
+                parsed = urlparse(self.SUPABASE_URL)
+                if parsed.scheme not in ("http", "https") or not parsed.netloc:
+                    errors.append("SUPABASE_URL must be an http(s) URL")
+            if not self.SUPABASE_KEY:
+                errors.append("SUPABASE_KEY is required")
+            if self.AUTH_VERIFY_MODE not in AUTH_VERIFY_MODES:
+                errors.append(f"AUTH_VERIFY_MODE must be one of {', '.join(AUTH_VERIFY_MODES)}")
+            elif (
+                self.AUTH_VERIFY_MODE == "local"
+                and not (self.SUPABASE_JWT_SECRET or self.SUPABASE_JWKS_URL or self.AUTH_REMOTE_FALLBACK)
+            ):
+                # Otherwise every HS256 token would be rejected with a 401
+                errors.append(
+                    "AUTH_VERIFY_MODE=local needs SUPABASE_JWT_SECRET (or SUPABASE_JWKS_URL "
+                    "for asymmetric keys, or AUTH_REMOTE_FALLBACK=true)"
+                )
+        if self.STARTUP_BUDGET_MS <= 0:
+            errors.append("STARTUP_BUDGET_MS must be positive")
+        if self.JSON_PROVIDER not in JSON_PROVIDERS:
+            errors.append(f"JSON_PROVIDER must be one of {', '.join(JSON_PROVIDERS)}")
+        if errors:
+            raise ConfigError("Invalid configuration: " + "; ".join(errors))
+        return self
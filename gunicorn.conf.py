@@ -0,0 +1,20 @@
+import os
+
+# Load the app once in the master; each worker then builds its own Supabase
+# connection pool on first use (see services/supabase_client.py).
+preload_app = True
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+
+def post_worker_init(worker):
+    from services import refresh
+    from services.catalogue_replica import catalogue_replica
+    from services.supabase_client import SupabaseClient
+
+    SupabaseClient().warm_up()
+    # Background threads are started per worker, never in the master
+    catalogue_replica.start()
+    refresh.warm_up()
@@ -0,0 +1,53 @@
+from typing import List, Optional, Union
+from pydantic import BaseModel, validator
+
+class PropertyCreate(BaseModel):
+    external_id: Optional[str] = None
+    title: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    category_id: Optional[Union[int, str]] = None
+    price_per_night: Optional[float] = None
+    main_image_url: Optional[str] = None
+    gallery_images: List[str] = []
+    facility_ids: List[Union[int, str]] = []
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    @validator('title')
+    def validate_title(cls, value):
+        value = value.strip()
+        if not value:
+            raise ValueError("title must not be empty")
+        return value
+
+    @validator('price_per_night')
+    def validate_price(cls, value):
+        if value is not None and value < 0:
+            raise ValueError("price_per_night must not be negative")
+        return value
+
+    @validator('latitude', 'longitude', pre=True)
+    def blank_coordinates(cls, value):
+        return None if value == "" else value
+
+    @validator('latitude')
+    def validate_latitude(cls, value):
+        if value is not None and not -90 <= value <= 90:
+            raise ValueError("latitude must be between -90 and 90")
+        return value
+
+    @validator('longitude')
+    def validate_longitude(cls, value):
+        if value is not None and not -180 <= value <= 180:
+            raise ValueError("longitude must be between -180 and 180")
+        return value
+
+    @validator('gallery_images', 'facility_ids', pre=True)
+    def split_lists(cls, value):
+        # CSV rows carry lists as "a|b|c"
+        if value is None or value == "":
+            return []
+        if isinstance(value, str):
+            return [item.strip() for item in value.split("|") if item.strip()]
+        return value
@@ -1,13 +1,136 @@
-import json
 import os
 from flask import Blueprint, request, jsonify
 from services.supabase_client import supabase
-from openai import OpenAI
+from services.enrichment import CARD_FIELDS, card_columns, enrich_properties
+from services.reference_data import categories
+from services.catalogue_replica import catalogue_replica
+from services.facility_index import facility_index
+from services.geo_index import geo_index
+from services.geocoding import gazetteer
+from services.queries import IN_CHUNK_SIZE
+from services.filter_extraction import extract_filters, normalize_query, stats as filter_stats
+from services.openai_client import OpenAIUnavailable, openai
+from services.resilience import UpstreamUnavailable, budget, time_budget
+from utils.pagination import iter_pages
+from utils.projection import InvalidFields, parse_fields
+from utils.singleflight import coalesce, flights
+from utils.stale import serve_stale
+from utils.sse import sse_event, sse_response
 
 ai_bp = Blueprint("ai", __name__)
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+AI_LOCATION_RADIUS_KM = float(os.getenv("AI_LOCATION_RADIUS_KM", "25"))
+AI_STREAM_BATCH_SIZE = int(os.getenv("AI_STREAM_BATCH_SIZE", "20"))
+AI_TIME_BUDGET = float(os.getenv("AI_TIME_BUDGET", "15"))
+
+def _plan_query(filters, columns="*"):
+    """Resolve extracted filters into ``(build_query, nearby_ids, allowed_ids, criteria)``.
+
+    ``criteria`` holds the same column filters for the catalogue replica.
+    """
+    # Filter: location. Places in the gazetteer become a radius search
+    # (nearest first); anything else falls back to a substring match.
+    location = filters.get("location")
+    nearby_ids = None
+    if location and (coordinates := gazetteer.geocode(location)):
+        nearby_ids = [
+            property_id
+            for property_id, _ in geo_index.nearest(*coordinates, AI_LOCATION_RADIUS_KM)
+        ]
+        location = None
+
+    # Filter: category
+    category_id = None
+    category_name = filters.get("category", "").strip().lower()
+    if category_name and category_name != "any":
+        category_id = categories.find_id(category_name)
+
+    # Filter: must_have facilities, resolved against the facility index
+    must_have = [f.strip().lower() for f in filters.get("must_have", [])]
+    allowed_ids = facility_index.properties_with_all(must_have) if must_have else None
+    if nearby_ids is not None and allowed_ids is not None:
+        nearby_ids = [property_id for property_id in nearby_ids if property_id in allowed_ids]
+        allowed_ids = None
+
+    def build_query():
+        q = supabase.table("properties").select(columns)
+        if location:
+            q = q.ilike("location", f"%{location}%")
+        if category_id is not None:
+            q = q.eq("category_id", category_id)
+        # Filter: price range
+        if filters.get("min_price") is not None:
+            q = q.gte("price_per_night", filters["min_price"])
+        if filters.get("max_price") is not None:
+            q = q.lte("price_per_night", filters["max_price"])
+        # Push small must_have matches into the query
+        if allowed_ids is not None and len(allowed_ids) <= IN_CHUNK_SIZE:
+            q = q.in_("id", list(allowed_ids))
+        return q
+
+    criteria = {
+        "location": location,
+        "category_id": category_id,
+        "min_price": filters.get("min_price"),
+        "max_price": filters.get("max_price"),
+    }
+    return build_query, nearby_ids, allowed_ids, criteria
+
+
+def _iter_candidates(build_query, nearby_ids, allowed_ids, criteria, batch_size=None):
+    """Yield batches of matching property rows.
+
+    Without ``batch_size`` everything comes back in one batch from a
+    single query; with it rows are paged so the first batch is ready early.
+    """
+    if allowed_ids == set():
+        return
+
+    snapshot = catalogue_replica.snapshot()
+    if snapshot:
+        rows = catalogue_replica.select(snapshot, order=nearby_ids, ids=allowed_ids, **criteria)
+        step = batch_size or max(len(rows), 1)
+        for i in range(0, len(rows), step):
+            yield rows[i:i + step]
+        return
+
+    if nearby_ids is not None:
+        # Only the candidates inside the radius, fetched by id in rank order
+        rank = {property_id: i for i, property_id in enumerate(nearby_ids)}
+        step = batch_size or IN_CHUNK_SIZE
+        rows = []
+        for i in range(0, len(nearby_ids), step):
+            chunk = nearby_ids[i:i + step]
+            batch = build_query().in_("id", chunk).execute().data or []
+            batch.sort(key=lambda prop: rank[prop["id"]])
+            if batch_size:
+                if batch:
+                    yield batch
+            else:
+                rows.extend(batch)
+        if rows:
+            yield rows
+        return
+
+    pages = iter_pages(build_query, batch_size) if batch_size else [build_query().execute().data or []]
+    for rows in pages:
+        # Drop candidates the index excludes (large must_have matches)
+        if allowed_ids is not None:
+            rows = [prop for prop in rows if prop["id"] in allowed_ids]
+        if rows:
+            yield rows
+
+
+def _query_signature():
+    # Queries differing only in case, spacing or punctuation share one run
+    query = (request.get_json(silent=True) or {}).get("query")
+    query = normalize_query(query) if isinstance(query, str) else repr(query)
+    return query, request.args.get("fields")
+
 
 @ai_bp.route("/ai-recommendations", methods=["POST"])
+@serve_stale(key=_query_signature, dependencies=("openai", "supabase"))
+@time_budget(AI_TIME_BUDGET)
+@coalesce(key=_query_signature)
 def ai_recommendations():
     data = request.json
     query = data.get("query", "").strip()
@@ -15,122 +138,79 @@ def ai_recommendations():
     if not query:
         return jsonify({"error": "Missing or empty query"}), 400
 
-    system_prompt = """
-    You are a filter assistant for a property booking app.
-    Given a user's request, extract these fields and return JSON only:
-
-    {
-      "location": "city or town name (optional)",
-      "category": "Apartment | Villa | Cottage | House | Any (optional)",
-      "min_price": 0,
-      "max_price": 5000,
-      "must_have": ["wifi", "pool", ...] (list of desired facility names, optional)
-    }
-
-    Output ONLY valid JSON. Do not include any explanation or formatting.
-    """
-
     try:
-        # Step 1: Generate structured filter from user query
-        response = openai.chat.completions.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ]
-        )
+        fields = parse_fields(request.args, allowed=CARD_FIELDS)
 
-        filters = json.loads(response.choices[0].message.content)
+        # Step 1: Generate structured filter from user query (cached / local fast path)
+        filters = extract_filters(query, openai)
 
         # Step 2: Query base properties
-        q = supabase.table("properties").select("*")
+        properties = [
+            prop
+            for batch in _iter_candidates(*_plan_query(filters, card_columns(fields)))
+            for prop in batch
+        ]
 
-        # Filter: location
-        if location := filters.get("location"):
-            q = q.ilike("location", f"%{location}%")
-
-        # Filter: category
-        category_name = filters.get("category", "").strip().lower()
-        if category_name and category_name != "any":
-            category_res = supabase.table("category").select("id").ilike("name", f"%{category_name}%").limit(1).execute()
-            if category_res.data:
-                category_id = category_res.data[0]["id"]
-                q = q.eq("category_id", category_id)
-
-        # Filter: price range
-        if filters.get("min_price") is not None:
-            q = q.gte("price_per_night", filters["min_price"])
-        if filters.get("max_price") is not None:
-            q = q.lte("price_per_night", filters["max_price"])
-
-        # Step 3: Execute initial query
-        properties = q.execute().data or []
-
-        # Step 4: Filter by must_have facilities
-        must_have = [f.strip().lower() for f in filters.get("must_have", [])]
-        if must_have:
-            filtered = []
-            for prop in properties:
-                prop_id = prop["id"]
-                facilities_res = (
-                    supabase.table("property_facilities")
-                    .select("facility_id, facilities(name)")
-                    .eq("property_id", prop_id)
-                    .execute()
-                )
-
-                facilities = [f["facilities"]["name"].strip().lower() for f in facilities_res.data or []]
-
-                if all(item in facilities for item in must_have):
-                    filtered.append(prop)
-            properties = filtered
-
-        # Step 5: Enrich properties for frontend (match /properties format)
-        enriched_properties = []
-
-        for prop in properties:
-            property_id = prop["id"]
-
-            # Thumbnail
-            images_res = (
-                supabase.table("property_images")
-                .select("image_url")
-                .eq("property_id", property_id)
-                .limit(1)
-                .execute()
-            )
-            thumbnail = images_res.data[0]["image_url"] if images_res.data else None
-
-            # Rating
-            reviews_res = (
-                supabase.table("reviews")
-                .select("rating")
-                .eq("property_id", property_id)
-                .execute()
-            )
-            ratings = [r["rating"] for r in reviews_res.data]
-            average_rating = round(sum(ratings) / len(ratings), 1) if ratings else None
-
-            # Category
-            category_res = (
-                supabase.table("category")
-                .select("name")
-                .eq("id", prop.get("category_id"))
-                .execute()
-            )
-            category_name = category_res.data[0]["name"] if category_res.data else None
-
-            enriched_properties.append({
-                "id": property_id,
-                "title": prop["title"],
-                "location": prop.get("location"),
-                "category": category_name,
-                "price_per_night": prop.get("price_per_night"),
-                "thumbnail": thumbnail or prop.get("main_image_url"),
-                "average_rating": average_rating,
-            })
+        # Step 3: Enrich properties for frontend (match /properties format)
+        enriched_properties = enrich_properties(properties, fields, catalogue_replica.lookups())
 
         return jsonify(enriched_properties), 200
 
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
+    except OpenAIUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@ai_bp.route("/ai-recommendations/stream", methods=["POST"])
+def ai_recommendations_stream():
+    """Same results as /ai-recommendations, as Server-Sent Events.
+
+    Emits ``filters`` once the query is understood, ``properties`` for each
+    enriched batch, then ``done`` (or ``error``).
+    """
+    data = request.json
+    query = data.get("query", "").strip()
+
+    if not query:
+        return jsonify({"error": "Missing or empty query"}), 400
+    try:
+        fields = parse_fields(request.args, allowed=CARD_FIELDS)
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
+
+    def events():
+        # Open the stream before the (possibly slow) model call
+        yield ": ok\n\n"
+        count = 0
+        try:
+            # The view has returned by now, so the stream sets its own budget
+            with budget(AI_TIME_BUDGET):
+                filters = extract_filters(query, openai, stream=True)
+                yield sse_event("filters", filters)
+
+                plan = _plan_query(filters, card_columns(fields))
+                prefetched = catalogue_replica.lookups()
+                for batch in _iter_candidates(*plan, batch_size=AI_STREAM_BATCH_SIZE):
+                    cards = enrich_properties(batch, fields, prefetched)
+                    count += len(cards)
+                    yield sse_event("properties", cards)
+
+            yield sse_event("done", {"count": count})
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return sse_response(events())
+
+
+@ai_bp.route("/ai-recommendations/stats", methods=["GET"])
+def ai_recommendation_stats():
+    return jsonify({
+        "filter_extraction": filter_stats.snapshot(),
+        "coalescing": flights.snapshot(),
+        "catalogue_replica": catalogue_replica.stats(),
+    }), 200
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from services.supabase_client import supabase
-from utils.auth_guard import require_auth
+from services.resilience import UpstreamUnavailable
+from services.supabase_client import SupabaseClient, supabase
+from utils.auth_guard import require_auth, get_bearer_token
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -45,7 +46,7 @@ def signup():
 def submit_kyc():
     data = request.json
     try:
-        # access_token = request.headers.get("Authorization").split(" ")[1]
+        # access_token = get_bearer_token()
 
         # Update KYC data in user_metadata
         res = supabase.auth.update_user(
@@ -108,18 +109,25 @@ def update_user():
         if "user_metadata" in data:
             update_data["data"] = data["user_metadata"]
 
-        # Use the access token from the auth header
-        access_token = request.headers.get("Authorization").split(" ")[1]
-
-        # res = supabase.auth.update_user(update_data, access_token=access_token)
-        res = supabase.auth.update_user(update_data)
-
+        # Update the caller's own account with their token, not the shared
+        # client's session
+        client = SupabaseClient()
+        res = client.http_client().put(
+            f"{client.url}/auth/v1/user",
+            json=update_data,
+            headers={"apikey": client.key, "Authorization": f"Bearer {get_bearer_token()}"},
+        )
+        if not res.is_success:
+            error = res.json() if "json" in res.headers.get("content-type", "") else {}
+            raise ValueError(error.get("msg") or error.get("error_description") or res.text)
 
         return jsonify({
             "status": "success",
-            "user": res.user.dict() if res.user else None
+            "user": res.json()
         }), 200
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({
             "status": "error",
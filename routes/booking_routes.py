@@ -1,26 +1,62 @@
 from flask import Blueprint, request, jsonify
 from services.supabase_client import supabase
+from services.availability import availability, parse_stay
+from services import booking_history
+from services.resilience import UpstreamUnavailable
 from utils.auth_guard import require_auth
+from utils.http_cache import invalidate
+from utils.idempotency import idempotent, key_mismatch_response, mark_replayed
+from utils.pagination import InvalidPageRequest, is_paginated, parse_page_args
 
 booking_bp = Blueprint("booking", __name__)
 
 @booking_bp.route("/book", methods=["POST"])
 @require_auth
+@idempotent("book", owner=lambda: request.user.id)
 def book_property():
     data = request.json
-    print(data)
     try:
-        booking_data = {
-            "user_id": request.user.id,
-            "property_id": data["property_id"],
-            "check_in": data["check_in"],
-            "check_out": data["check_out"],
-            "guests": data["guests"],
-            "payment_status": "paid",  # or "pending" depending on simulation
-            "amount_paid": data["amount_paid"],
-        }
-        res = supabase.table("bookings").insert(booking_data).execute()
-        return jsonify(res.data), 200
+        try:
+            parse_stay(data.get("check_in"), data.get("check_out"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # A keyed retry of a booking that already went through must reach the
+        # database to be replayed, not be rejected by the local index.
+        if not request.idempotency_key and availability.has_conflict(
+            data["property_id"], data["check_in"], data["check_out"]
+        ):
+            return jsonify({"error": "Property is already booked for these dates"}), 409
+
+        # Overlap check, booking insert and optional payment in one transaction
+        result = supabase.rpc("create_booking", {
+            "p_user_id": request.user.id,
+            "p_property_id": data["property_id"],
+            "p_check_in": data["check_in"],
+            "p_check_out": data["check_out"],
+            "p_guests": data["guests"],
+            "p_amount_paid": data["amount_paid"],
+            "p_payment_method": data.get("payment_method"),
+            "p_idempotency_key": request.idempotency_key,
+            "p_request_hash": request.request_hash,
+        }).execute().data
+
+        if result["status"] == "conflict":
+            return jsonify({"error": "Property is already booked for these dates"}), 409
+        if result["status"] == "key_mismatch":
+            return key_mismatch_response()
+
+        if result["status"] == "created":
+            availability.add(data["property_id"], data["check_in"], data["check_out"])
+            booking_history.invalidate(request.user.id)
+            invalidate("properties")
+
+        response = jsonify([result["booking"]])
+        if result["status"] == "replayed":
+            mark_replayed(response)
+        return response, 200
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -28,29 +64,18 @@ def book_property():
 @require_auth
 def get_user_bookings(user_id):
     try:
-        response = supabase.table("bookings").select(
-            "id, payment_status, amount_paid, property_id, "
-            "properties(title, property_images(image_url))"
-        ).eq("user_id", user_id).execute()
+        if is_paginated(request.args):
+            limit, cursor = parse_page_args(request.args)
+            bookings, next_cursor = booking_history.user_bookings(user_id, limit, cursor)
+            return jsonify({"bookings": bookings, "next_cursor": next_cursor})
 
-        bookings = response.data
-
-        formatted = []
-        for booking in bookings:
-            props = booking.get("properties", {})
-            images = props.get("property_images", [])
-            image_url = images[0]["image_url"] if images else None
-
-            formatted.append({
-                "id": booking["id"],
-                "payment_status": booking["payment_status"],
-                "price": booking["amount_paid"],
-                "bnbName": props.get("title"),
-                "imageUrl": image_url
-            })
-
-        return jsonify({"bookings": formatted})
+        bookings, _ = booking_history.user_bookings(user_id)
+        return jsonify({"bookings": bookings})
 
+    except InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
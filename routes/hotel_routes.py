@@ -1,12 +1,45 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from services.supabase_client import supabase
+from services.resilience import UpstreamUnavailable
+from utils.pagination import (
+    InvalidPageRequest,
+    fetch_page,
+    is_paginated,
+    iter_pages,
+    parse_page_args,
+    stream_json_array,
+    wants_stream,
+)
+from utils.http_cache import cached_response
+from utils.projection import InvalidFields, parse_fields, project, select_columns
 
 hotel_bp = Blueprint("hotels", __name__)
 
 @hotel_bp.route("/hotels", methods=["GET"])
+@cached_response(tags=("hotels",), max_age=300)
 def get_hotels():
     try:
-        data = supabase.table("hotels").select("*").execute()
+        fields = parse_fields(request.args)
+        paged = is_paginated(request.args) or wants_stream(request.args)
+        # Keyset paging orders and resumes on (created_at, id)
+        columns = select_columns(fields, ("id", "created_at") if paged else ())
+
+        def build_query():
+            return supabase.table("hotels").select(columns)
+
+        if wants_stream(request.args):
+            return stream_json_array(iter_pages(build_query), lambda rows: project(rows, fields))
+
+        if is_paginated(request.args):
+            limit, cursor = parse_page_args(request.args)
+            rows, next_cursor = fetch_page(build_query, limit, cursor)
+            return jsonify({"items": project(rows, fields), "next_cursor": next_cursor}), 200
+
+        data = build_query().execute()
         return jsonify(data.data), 200
+    except (InvalidPageRequest, InvalidFields) as e:
+        return jsonify({"error": str(e)}), 400
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,10 +1,15 @@
 from flask import Blueprint, request, jsonify
-from services.supabase_client import SupabaseClient
+from services.supabase_client import supabase
+from services import booking_history
+from services.resilience import UpstreamUnavailable
+from utils.auth_guard import require_auth
+from utils.idempotency import idempotent, key_mismatch_response, mark_replayed
 
 payment_bp = Blueprint('payments', __name__)
-supabase = SupabaseClient().get_client()
 
 @payment_bp.route('/process', methods=['POST'])
+@require_auth
+@idempotent('payment', owner=lambda: request.user.id)
 def process_payment():
     try:
         data = request.json
@@ -15,26 +20,35 @@ def process_payment():
         # In a real app, you would integrate with a payment processor here
         # For demo, we'll just simulate a successful payment
         
-        # Update booking status
-        supabase.table('bookings').update({
-            'status': 'confirmed',
-            'payment_status': 'paid',
-            'payment_date': 'now()'
-        }).eq('id', booking_id).execute()
-        
-        # Create payment record
-        payment = supabase.table('payments').insert({
-            'booking_id': booking_id,
-            'amount': amount,
-            'method': payment_method,
-            'status': 'completed'
-        }).execute()
+        # Confirm the booking and record the payment in one transaction;
+        # bookings of other users are reported as not found
+        result = supabase.rpc('process_booking_payment', {
+            'p_user_id': request.user.id,
+            'p_booking_id': booking_id,
+            'p_amount': amount,
+            'p_payment_method': payment_method,
+            'p_idempotency_key': request.idempotency_key,
+            'p_request_hash': request.request_hash,
+        }).execute().data
+
+        if result['status'] == 'not_found':
+            return jsonify({'error': 'Booking not found'}), 404
+        if result['status'] == 'key_mismatch':
+            return key_mismatch_response()
+
+        if result['status'] == 'created':
+            booking_history.invalidate(request.user.id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'payment_id': payment.data[0]['id'],
+            'payment_id': result['payment']['id'],
             'booking_status': 'confirmed'
-        }), 200
+        })
+        if result['status'] == 'replayed':
+            mark_replayed(response)
+        return response, 200
         
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 400
\ No newline at end of file
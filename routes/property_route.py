@@ -1,17 +1,58 @@
 from flask import Blueprint, request, jsonify
 from services.supabase_client import supabase
+from services.enrichment import CARD_FIELDS, card_columns, enrich_properties
+from services.reference_data import categories
+from services.facility_index import facility_index
+from services.fanout import run_parallel
+from services.availability import availability
+from services.catalogue_replica import catalogue_replica
+from services.queries import IN_CHUNK_SIZE, fetch_in
+from services.search_index import search_index
+from services.similarity_index import SimilarityUnavailable, similarity_index
+from services.geo_index import GEO_MAX_RADIUS_KM, geo_index
+from services.geocoding import coordinates_for
+from services.resilience import UpstreamUnavailable, time_budget
 from utils.auth_guard import require_auth
+from utils.http_cache import cached_response, invalidate
+from utils.singleflight import coalesce
+from utils.stale import serve_stale
+from utils.projection import parse_fields
+from utils.pagination import (
+    STREAM_BATCH_SIZE,
+    encode_offset_cursor,
+    fetch_page,
+    is_paginated,
+    iter_pages,
+    parse_offset_page_args,
+    parse_page_args,
+    stream_json_array,
+    wants_stream,
+)
+import io
+import os
 import uuid
 
 property_bp = Blueprint("property", __name__)
 
+GEO_DEFAULT_RADIUS_KM = float(os.getenv("GEO_DEFAULT_RADIUS_KM", "25"))
+SIMILAR_DEFAULT_K = 6
+PROPERTIES_TIME_BUDGET = float(os.getenv("PROPERTIES_TIME_BUDGET", "3"))
+# A bulk import makes one round trip per chunk, far more than the default budget allows
+BULK_INGEST_TIME_BUDGET = float(os.getenv("BULK_INGEST_TIME_BUDGET", "600"))
+SIMILAR_MAX_K = 50
+
 
 @property_bp.route("/properties", methods=["POST"])
 @require_auth
 def create_property():
     try:
         data = request.json
-        user_id = request.user["id"]
+        user_id = request.user.id
+
+        # Coordinates for radius search: explicit, or geocoded from location
+        latitude, longitude = coordinates_for(
+            data.get("location"), data.get("latitude"), data.get("longitude")
+        )
 
         # Insert into properties table
         property_data = {
@@ -22,6 +63,8 @@ def create_property():
             "rating": data.get("rating", 0),
             "review_count": data.get("review_count", 0),
             "main_image_url": data.get("main_image_url"),
+            "latitude": latitude,
+            "longitude": longitude,
             "owner_id": user_id,
         }
 
@@ -45,55 +88,124 @@ def create_property():
                 for fid in facility_ids
             ]
             supabase.table("property_facilities").insert(facility_data).execute()
+            facility_index.add(prop_id, facility_ids)
+
+        search_index.add(property_data)
+        geo_index.add(prop_id, latitude, longitude)
+        similarity_index.add(property_data, facility_ids)
+        catalogue_replica.notify()
+        invalidate("properties")
 
         return jsonify({"message": "Property created", "property_id": prop_id}), 201
 
+    except UpstreamUnavailable:
+        # Answered with a 503 and Retry-After by the app's error handler
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@property_bp.route("/properties/bulk", methods=["POST"])
+@require_auth
+@time_budget(BULK_INGEST_TIME_BUDGET)
+def bulk_create_properties():
+    # Imported here so workers that never ingest skip loading pydantic
+    from services import bulk_ingest
+
+    try:
+        upload = request.files.get("file")
+        if upload:
+            fmt = request.args.get("format") or bulk_ingest.detect_format(upload.filename)
+            lines = io.TextIOWrapper(upload.stream, encoding="utf-8")
+        else:
+            fmt = request.args.get("format") or (
+                "csv" if request.mimetype == "text/csv" else "jsonl"
+            )
+            lines = io.TextIOWrapper(request.stream, encoding="utf-8")
+
+        errors = []
+        summary = bulk_ingest.ingest(
+            bulk_ingest.read_rows(lines, fmt),
+            owner_id=request.user.id,
+            start_after=int(request.args.get("start_after", 0)),
+            on_error=lambda row, errs: errors.append({"row": row, "errors": errs}),
+        )
+
+        if summary["written"]:
+            catalogue_replica.notify()
+            invalidate("properties")
+
+        return jsonify({**summary, "errors": errors}), 200 if not errors else 207
+
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@property_bp.route("/properties/autocomplete", methods=["GET"])
+@cached_response(tags=("properties",), max_age=30)
+def autocomplete_properties():
+    try:
+        query = request.args.get("q", "")
+        limit = min(int(request.args.get("limit", 10)), 50)
+        if not query.strip():
+            return jsonify([]), 200
+        return jsonify(search_index.suggest(query, limit)), 200
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
 @property_bp.route("/properties/<property_id>", methods=["GET"])
+@cached_response(tags=("properties",), max_age=60)
 def get_property_by_id(property_id):
     try:
-        # Get property info
-        prop = (
-            supabase.table("properties")
-            .select("*")
-            .eq("id", property_id)
-            .single()
-            .execute()
+        # The four reads are independent, so run them concurrently
+        results = run_parallel(
+            {
+                # Get property info
+                "property": lambda: (
+                    supabase.table("properties")
+                    .select("*")
+                    .eq("id", property_id)
+                    .single()
+                    .execute()
+                ),
+                # Get gallery images
+                "images": lambda: (
+                    supabase.table("property_images")
+                    .select("image_url")
+                    .eq("property_id", property_id)
+                    .execute()
+                ),
+                # Get facilities
+                "facilities": lambda: (
+                    supabase.table("property_facilities")
+                    .select("facility_id, facilities(name)")
+                    .eq("property_id", property_id)
+                    .execute()
+                ),
+                # Get reviews (limit to 3)
+                "reviews": lambda: (
+                    supabase.table("review_with_user_email")
+                    .select("*")
+                    .eq("property_id", property_id)
+                    .limit(3)
+                    .order("created_at", desc=True)
+                    .execute()
+                ),
+            }
         )
+
+        prop = results["property"]
         if not prop.data:
             return jsonify({"error": "Property not found"}), 404
 
-        # Get gallery images
-        images = (
-            supabase.table("property_images")
-            .select("image_url")
-            .eq("property_id", property_id)
-            .execute()
-        )
-
-        # Get facilities
-        facilities_join = (
-            supabase.table("property_facilities")
-            .select("facility_id, facilities(name)")
-            .eq("property_id", property_id)
-            .execute()
-        )
-
-        print(facilities_join.data)
-
-        # Get reviews (limit to 3)
-        # Replace reviews table call
-        reviews = (
-            supabase.table("review_with_user_email")
-            .select("*")
-            .eq("property_id", property_id)
-            .limit(3)
-            .order("created_at", desc=True)
-            .execute()
-        )
+        images = results["images"]
+        facilities_join = results["facilities"]
+        reviews = results["reviews"]
 
         return (
             jsonify(
@@ -121,81 +233,234 @@ def get_property_by_id(property_id):
             200,
         )
 
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@property_bp.route("/properties/<property_id>/similar", methods=["GET"])
+@cached_response(tags=("properties",), max_age=60)
+def get_similar_properties(property_id):
+    try:
+        try:
+            k = int(request.args.get("k", SIMILAR_DEFAULT_K))
+        except ValueError:
+            return jsonify({"error": "k must be an integer"}), 400
+        if not 1 <= k <= SIMILAR_MAX_K:
+            return jsonify({"error": f"k must be between 1 and {SIMILAR_MAX_K}"}), 400
+
+        neighbours = similarity_index.similar(property_id, k)
+        if neighbours is None:
+            return jsonify({"error": "Property not found"}), 404
+
+        ids = [neighbour_id for neighbour_id, _ in neighbours]
+        snapshot = catalogue_replica.snapshot()
+        if snapshot:
+            rows = catalogue_replica.rows_by_id(snapshot, ids)
+        else:
+            rows = fetch_in("properties", "*", "id", ids)
+        by_id = {row["id"]: row for row in rows}
+        rows = [by_id[neighbour_id] for neighbour_id in ids if neighbour_id in by_id]
+
+        scores = dict(neighbours)
+        cards = enrich_properties(rows, prefetched=catalogue_replica.lookups())
+        for card in cards:
+            card["similarity"] = scores[card["id"]]
+        return jsonify(cards), 200
+
+    except SimilarityUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
 @property_bp.route("/categories", methods=["GET"])
+@cached_response(tags=("categories",), max_age=600)
 def get_all_categories():
     try:
-        result = supabase.table("category").select("*").execute()
-        return jsonify(result.data), 200
+        return jsonify(categories.all()), 200
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
 @property_bp.route("/properties", methods=["GET"])
+@serve_stale()
+@time_budget(PROPERTIES_TIME_BUDGET)
+@cached_response(tags=("properties",), max_age=30)
+@coalesce(skip=lambda: wants_stream(request.args))
 def get_all_properties():
     try:
         category_id = request.args.get("category_id")
         search = request.args.get("search")
-
-        query = supabase.table("properties").select("*")
-
-        if category_id:
-            query = query.eq("category_id", category_id)
+        check_in = request.args.get("check_in")
+        check_out = request.args.get("check_out")
+        # Projection: only the card fields asked for, and only their columns
+        fields = parse_fields(request.args, allowed=(*CARD_FIELDS, "distance_km"))
+        card_fields = None if fields is None else tuple(f for f in fields if f in CARD_FIELDS)
+        columns = card_columns(card_fields)
+
+        # Availability: exclude listings with a booking overlapping the stay
+        booked_ids = set()
+        if check_in or check_out:
+            booked_ids = availability.booked_property_ids(check_in, check_out)
+
+        def available(rows):
+            return [row for row in rows if row["id"] not in booked_ids]
+
+        def build_query():
+            query = supabase.table("properties").select(columns)
+
+            if category_id:
+                query = query.eq("category_id", category_id)
+
+            if booked_ids and len(booked_ids) <= IN_CHUNK_SIZE:
+                query = query.not_.in_("id", list(booked_ids))
+            return query
+
+        def keep(row):
+            if category_id and str(row.get("category_id")) != str(category_id):
+                return False
+            return row["id"] not in booked_ids
+
+        # Radius search: nearest first, from the in-process geohash index
+        near = _parse_near(request.args)
+        distances = None
+        if near:
+            nearest = geo_index.nearest(*near)
+            distances = dict(nearest)
 
         if search:
-            query = query.or_(
-                f"title.ilike.%{search}%,location.ilike.%{search}%"
+            # Filter inside the index, before it cuts to its top matches
+            def matches(property_id, row_category_id):
+                if category_id and str(row_category_id) != str(category_id):
+                    return False
+                if distances is not None and property_id not in distances:
+                    return False
+                return property_id not in booked_ids
+
+            ranked_ids = [property_id for property_id, _ in search_index.search(search, where=matches)]
+            return _ranked_properties(ranked_ids, keep, distances, fields)
+
+        if distances is not None:
+            return _ranked_properties(
+                [property_id for property_id, _ in nearest], keep, distances, fields
             )
 
-        result = query.order("created_at", desc=True).execute()
-        properties = result.data
-
-        all_properties = []
-
-        for prop in properties:
-            property_id = prop["id"]
-
-            images_result = (
-                supabase.table("property_images")
-                .select("image_url")
-                .eq("property_id", property_id)
-                .limit(1)
-                .execute()
-            )
-
-            reviews_result = (
-                supabase.table("reviews")
-                .select("rating")
-                .eq("property_id", property_id)
-                .execute()
-            )
-
-            category_result = (
-                supabase.table("category")
-                .select("name")
-                .eq("id", prop.get("category_id"))
-                .execute()
-            )
-
-            ratings = [r["rating"] for r in reviews_result.data]
-            average_rating = round(sum(ratings) / len(ratings), 1) if ratings else None
-
-            all_properties.append(
-                {
-                    "id": prop["id"],
-                    "title": prop["title"],
-                    "location": prop.get("location"),
-                    "category": category_result.data[0]["name"] if category_result.data else None,
-                    "price_per_night": prop.get("price_per_night"),
-                    "thumbnail": prop.get("main_image_url"),
-                    "average_rating": average_rating,
-                }
-            )
+        # Read replica: the same filters as vectorized masks, no Supabase call
+        snapshot = catalogue_replica.snapshot()
+        replica_filters = {"category_id": category_id or None, "exclude_ids": booked_ids}
+        prefetched = catalogue_replica.lookups() if snapshot else None
+
+        def cards(rows):
+            return enrich_properties(available(rows), card_fields, prefetched)
+
+        if wants_stream(request.args):
+            if snapshot:
+                rows = catalogue_replica.select(snapshot, **replica_filters)
+                pages = (rows[i:i + STREAM_BATCH_SIZE] for i in range(0, len(rows), STREAM_BATCH_SIZE))
+            else:
+                pages = iter_pages(build_query)
+            return stream_json_array(pages, cards)
+
+        if is_paginated(request.args):
+            limit, cursor = parse_page_args(request.args)
+            if snapshot:
+                rows, next_cursor = catalogue_replica.page(snapshot, limit, cursor, **replica_filters)
+            else:
+                # Exclusions too long for one not.in filter are applied here,
+                # fetching on until the page is full
+                excluded_in_process = len(booked_ids) > IN_CHUNK_SIZE
+                rows, next_cursor = fetch_page(
+                    build_query, limit, cursor, keep=keep if excluded_in_process else None
+                )
+            return jsonify({"items": cards(rows), "next_cursor": next_cursor}), 200
+
+        if snapshot:
+            rows = catalogue_replica.select(snapshot, **replica_filters)
+        else:
+            rows = build_query().order("created_at", desc=True).execute().data or []
+        all_properties = cards(rows)
 
         return jsonify(all_properties), 200
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+
+
+def _iter_ranked_rows(ranked_ids, keep, start=0, batch_size=IN_CHUNK_SIZE, columns="*"):
+    """Yield ``(position, row)`` in ranked order for rows passing ``keep``."""
+    snapshot = catalogue_replica.snapshot()
+    for i in range(start, len(ranked_ids), batch_size):
+        chunk = ranked_ids[i:i + batch_size]
+        if snapshot:
+            found = catalogue_replica.rows_by_id(snapshot, chunk)
+        else:
+            found = fetch_in("properties", columns, "id", chunk)
+        rows = {row["id"]: row for row in found}
+        for position, property_id in enumerate(chunk, start=i):
+            row = rows.get(property_id)
+            if row and keep(row):
+                yield position, row
+
+
+def _parse_near(args):
+    lat, lon = args.get("lat"), args.get("lon")
+    if lat is None and lon is None:
+        return None
+    if lat is None or lon is None:
+        raise ValueError("lat and lon must be given together")
+    lat, lon = float(lat), float(lon)
+    radius_km = float(args.get("radius_km", GEO_DEFAULT_RADIUS_KM))
+    if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        raise ValueError("lat/lon out of range")
+    if not 0 < radius_km <= GEO_MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be between 0 and {GEO_MAX_RADIUS_KM:g}")
+    return lat, lon, radius_km
+
+
+def _ranked_properties(ranked_ids, keep, distances=None, fields=None):
+    # Ranked in process (relevance or distance), then hydrated and filtered in order
+    card_fields = None if fields is None else tuple(f for f in fields if f in CARD_FIELDS)
+    columns = card_columns(card_fields)
+    with_distance = distances is not None and (fields is None or "distance_km" in fields)
+    prefetched = catalogue_replica.lookups()
+
+    def cards(rows):
+        enriched = enrich_properties(rows, card_fields, prefetched)
+        if with_distance:
+            for card, row in zip(enriched, rows):
+                card["distance_km"] = distances.get(row["id"])
+        return enriched
+
+    if wants_stream(request.args):
+        def batches():
+            batch = []
+            for _, row in _iter_ranked_rows(ranked_ids, keep, columns=columns):
+                batch.append(row)
+                if len(batch) == IN_CHUNK_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        return stream_json_array(batches(), cards)
+
+    if is_paginated(request.args):
+        limit, offset = parse_offset_page_args(request.args)
+        rows, next_cursor = [], None
+        for position, row in _iter_ranked_rows(ranked_ids, keep, start=offset, columns=columns):
+            if len(rows) == limit:
+                next_cursor = encode_offset_cursor(position)
+                break
+            rows.append(row)
+        return jsonify({"items": cards(rows), "next_cursor": next_cursor}), 200
+
+    rows = [row for _, row in _iter_ranked_rows(ranked_ids, keep, columns=columns)]
+    return jsonify(cards(rows)), 200
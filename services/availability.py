@@ -0,0 +1,173 @@
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.refresh import Refreshable
+
+AVAILABILITY_INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "120"))
+INACTIVE_STATUSES = {"cancelled", "canceled", "refunded"}
+
+
+def parse_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def parse_stay(check_in, check_out):
+    """Validate a stay; returns ``(check_in, check_out)`` as dates."""
+    dates = []
+    for name, value in (("check_in", check_in), ("check_out", check_out)):
+        if not value:
+            raise ValueError(f"{name} is required")
+        try:
+            dates.append(parse_date(value))
+        except ValueError:
+            raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    start, end = dates
+    if end <= start:
+        raise ValueError("check_out must be after check_in")
+    return start, end
+
+
+class _PropertyBookings:
+    """Bookings of one property as half-open [check_in, check_out) intervals.
+
+    Intervals are sorted by start with a running maximum of their ends, so
+    "does anything overlap [a, b)" is one bisect plus one lookup.
+    """
+
+    def __init__(self):
+        # Swapped as one tuple so readers never see the lists out of step.
+        self._state = ([], [])
+
+    def add(self, start, end):
+        intervals = list(self._state[0])
+        insort(intervals, (start, end))
+        max_end = []
+        for _, interval_end in intervals:
+            max_end.append(interval_end if not max_end else max(max_end[-1], interval_end))
+        self._state = (intervals, max_end)
+
+    def overlaps(self, start, end):
+        intervals, max_end = self._state
+        # Intervals starting before ``end`` are the only candidates.
+        i = bisect_left(intervals, (end,))
+        return i > 0 and max_end[i - 1] > start
+
+
+class _IntervalTree:
+    """Static interval tree over every booking, for "which properties are
+    booked during [a, b)" in O(log n + matches).
+
+    Intervals are sorted by start and viewed as an implicit balanced tree
+    (the middle of each range is its root); each root stores the largest
+    end in its range, so whole subtrees that end before ``a`` are skipped.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self._starts = [start for start, _, _ in intervals]
+        self._ends = [end for _, end, _ in intervals]
+        self._ids = [property_id for _, _, property_id in intervals]
+        self._max_end = list(self._ends)
+        self._augment(0, len(intervals))
+
+    def _augment(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        for child in (self._augment(lo, mid), self._augment(mid + 1, hi)):
+            if child is not None and child > self._max_end[mid]:
+                self._max_end[mid] = child
+        return self._max_end[mid]
+
+    def overlapping(self, start, end):
+        found = set()
+        self._collect(0, len(self._starts), start, end, found)
+        return found
+
+    def _collect(self, lo, hi, start, end, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= start:
+            return
+        self._collect(lo, mid, start, end, found)
+        # Everything right of mid starts at or after mid's start
+        if self._starts[mid] < end:
+            if self._ends[mid] > start:
+                found.add(self._ids[mid])
+            self._collect(mid + 1, hi, start, end, found)
+
+
+class AvailabilityIndex(Refreshable):
+    """Per-property interval index over current and future bookings.
+
+    Rebuilt from ``bookings`` every ``ttl`` seconds (to pick up bookings
+    made through other workers) and updated in place by ``add()``. Bookings
+    added since the last rebuild are kept aside from the interval tree and
+    checked one by one.
+    """
+
+    def __init__(self, ttl=AVAILABILITY_INDEX_TTL):
+        super().__init__(ttl)
+        self._by_property = {}
+        self._tree = _IntervalTree(())
+        self._added = []
+        self._lock = threading.Lock()
+
+    def _load(self):
+        today = date.today().isoformat()
+        rows = fetch_all(
+            lambda: supabase.table("bookings")
+            .select("id, property_id, check_in, check_out, status")
+            .gte("check_out", today)
+            .order("id")
+        )
+        by_property, intervals = {}, []
+        for row in rows:
+            if (row.get("status") or "").lower() in INACTIVE_STATUSES:
+                continue
+            try:
+                start, end = parse_stay(row["check_in"], row["check_out"])
+            except (TypeError, ValueError):
+                continue
+            by_property.setdefault(row["property_id"], _PropertyBookings()).add(start, end)
+            intervals.append((start, end, row["property_id"]))
+        tree = _IntervalTree(intervals)
+        with self._lock:
+            self._by_property = by_property
+            self._tree, self._added = tree, []
+
+    def add(self, property_id, check_in, check_out):
+        start, end = parse_stay(check_in, check_out)
+        with self._lock:
+            if not self.loaded:
+                return
+            self._by_property.setdefault(property_id, _PropertyBookings()).add(start, end)
+            self._added = self._added + [(start, end, property_id)]
+
+    def has_conflict(self, property_id, check_in, check_out):
+        start, end = parse_stay(check_in, check_out)
+        self._ensure_fresh()
+        bookings = self._by_property.get(property_id)
+        return bool(bookings and bookings.overlaps(start, end))
+
+    def booked_property_ids(self, check_in, check_out):
+        """Ids of properties with a booking overlapping the stay."""
+        start, end = parse_stay(check_in, check_out)
+        self._ensure_fresh()
+        tree, added = self._tree, self._added
+        booked = tree.overlapping(start, end)
+        booked.update(
+            property_id for added_start, added_end, property_id in added
+            if added_start < end and added_end > start
+        )
+        return booked
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,74 @@
+import os
+import threading
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from utils.pagination import fetch_page
+from utils.ttl_cache import TTLCache
+
+BOOKING_HISTORY_CACHE_SIZE = int(os.getenv("BOOKING_HISTORY_CACHE_SIZE", "2048"))
+# Writes in this worker invalidate at once; the TTL bounds how long
+# another worker's writes can go unseen.
+BOOKING_HISTORY_TTL = float(os.getenv("BOOKING_HISTORY_TTL", "30"))
+
+# One gallery image per property (limit on the embedded resource), not the
+# whole gallery of every booked listing.
+HISTORY_COLUMNS = (
+    "id, created_at, payment_status, amount_paid, property_id, "
+    "properties(title, property_images(image_url))"
+)
+
+_cache = TTLCache(maxsize=BOOKING_HISTORY_CACHE_SIZE, ttl=BOOKING_HISTORY_TTL)
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def invalidate(user_id):
+    """Drop every cached history page of ``user_id``."""
+    with _generations_lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+
+
+def _format(booking):
+    props = booking.get("properties") or {}
+    images = props.get("property_images") or []
+    return {
+        "id": booking["id"],
+        "payment_status": booking["payment_status"],
+        "price": booking["amount_paid"],
+        "bnbName": props.get("title"),
+        "imageUrl": images[0]["image_url"] if images else None,
+    }
+
+
+def _build_query(user_id):
+    return (
+        supabase.table("bookings")
+        .select(HISTORY_COLUMNS)
+        .eq("user_id", user_id)
+        .limit(1, foreign_table="properties.property_images")
+    )
+
+
+def user_bookings(user_id, limit=None, cursor=None):
+    """Return ``(bookings, next_cursor)``, newest first.
+
+    Without ``limit`` every booking comes back in one list (and
+    ``next_cursor`` is None); with it, one keyset page.
+    """
+    key = (user_id, _generations.get(user_id, 0), limit, cursor)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    if limit is None:
+        rows = fetch_all(
+            lambda: _build_query(user_id).order("created_at", desc=True).order("id", desc=True)
+        )
+        next_cursor = None
+    else:
+        rows, next_cursor = fetch_page(lambda: _build_query(user_id), limit, cursor)
+
+    result = ([_format(row) for row in rows], next_cursor)
+    _cache.set(key, result)
+    return result
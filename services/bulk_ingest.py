@@ -0,0 +1,152 @@
+import csv
+import hashlib
+import json
+import os
+import uuid
+
+from pydantic import ValidationError
+
+from models.property import PropertyCreate
+from services.supabase_client import supabase
+from services.reference_data import categories, facilities
+from services.facility_index import facility_index
+from services.search_index import search_index
+from services.similarity_index import similarity_index
+from services.geo_index import geo_index
+from services.geocoding import coordinates_for
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+
+# Ids are derived from the row so a re-run upserts onto the same primary
+# keys instead of inserting duplicates.
+INGEST_NAMESPACE = uuid.UUID("6f1c2f0e-3a52-4f51-9d3e-8d1b5c7a2e41")
+
+
+def detect_format(filename, default="jsonl"):
+    ext = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, default)
+
+
+def read_rows(lines, fmt):
+    """Yield ``(row_number, raw_row)`` from an iterable of text lines."""
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(lines), start=1):
+            yield row_number, {k: v for k, v in row.items() if v not in (None, "")}
+        return
+    for row_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, e
+
+
+def _property_id(owner_id, listing):
+    key = listing.external_id or hashlib.sha256(
+        json.dumps(listing.model_dump(), sort_keys=True).encode()
+    ).hexdigest()
+    return str(uuid.uuid5(INGEST_NAMESPACE, f"{owner_id}:{key}"))
+
+
+def _child_id(property_id, value):
+    return str(uuid.uuid5(INGEST_NAMESPACE, f"{property_id}:{value}"))
+
+
+def _upsert(table, rows, chunk_size):
+    for i in range(0, len(rows), chunk_size):
+        supabase.table(table).upsert(
+            rows[i:i + chunk_size], on_conflict="id", ignore_duplicates=True
+        ).execute()
+
+
+def _table_key(table, value):
+    # Unknown ids are written as given and left to the foreign key to reject
+    key = table.key_for(value)
+    return value if key is None else key
+
+
+def _write_chunk(owner_id, listings, chunk_size):
+    properties, images, facility_links = [], [], []
+    for listing in listings:
+        property_id = _property_id(owner_id, listing)
+        if listing.category_id is not None:
+            listing.category_id = _table_key(categories, listing.category_id)
+        listing.facility_ids = [_table_key(facilities, fid) for fid in listing.facility_ids]
+        latitude, longitude = coordinates_for(listing.location, listing.latitude, listing.longitude)
+        properties.append({
+            "id": property_id,
+            "title": listing.title,
+            "description": listing.description,
+            "location": listing.location,
+            "category_id": listing.category_id,
+            "price_per_night": listing.price_per_night,
+            "main_image_url": listing.main_image_url,
+            "latitude": latitude,
+            "longitude": longitude,
+            "rating": 0,
+            "review_count": 0,
+            "owner_id": owner_id,
+        })
+        images.extend(
+            {"id": _child_id(property_id, url), "property_id": property_id, "image_url": url}
+            for url in listing.gallery_images
+        )
+        facility_links.extend(
+            {"id": _child_id(property_id, fid), "property_id": property_id, "facility_id": fid}
+            for fid in listing.facility_ids
+        )
+
+    _upsert("properties", properties, chunk_size)
+    _upsert("property_images", images, chunk_size)
+    _upsert("property_facilities", facility_links, chunk_size)
+
+    search_index.add_many(properties)
+    for listing, prop in zip(listings, properties):
+        facility_index.add(prop["id"], listing.facility_ids)
+        geo_index.add(prop["id"], prop["latitude"], prop["longitude"])
+        similarity_index.add(prop, listing.facility_ids)
+    return properties
+
+
+def ingest(rows, owner_id, chunk_size=INGEST_CHUNK_SIZE, start_after=0,
+           on_error=None, on_chunk=None):
+    """Validate and write ``rows`` (from ``read_rows``) in multi-row chunks.
+
+    Rows numbered ``<= start_after`` are skipped so an interrupted run can
+    resume. ``on_error(row_number, errors)`` is called for each rejected row
+    and ``on_chunk(last_row_number, summary)`` after every chunk is written,
+    which is the point a caller should checkpoint. Returns the summary dict.
+    """
+    summary = {"processed": 0, "written": 0, "failed": 0, "last_row": start_after}
+    pending, pending_last_row = [], start_after
+
+    def flush():
+        if pending:
+            _write_chunk(owner_id, pending, chunk_size)
+            summary["written"] += len(pending)
+            pending.clear()
+        summary["last_row"] = pending_last_row
+        if on_chunk:
+            on_chunk(pending_last_row, dict(summary))
+
+    for row_number, raw in rows:
+        if row_number <= start_after:
+            continue
+        summary["processed"] += 1
+        pending_last_row = row_number
+        try:
+            if isinstance(raw, Exception):
+                raise ValueError(f"Invalid JSON: {raw}")
+            pending.append(PropertyCreate(**raw))
+        except (ValidationError, ValueError, TypeError) as e:
+            summary["failed"] += 1
+            if on_error:
+                errors = json.loads(e.json()) if isinstance(e, ValidationError) else [{"msg": str(e)}]
+                on_error(row_number, errors)
+        if len(pending) >= chunk_size:
+            flush()
+
+    flush()
+    return summary
@@ -0,0 +1,287 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.rating_summary import SUMMARY_TABLE
+from utils.http_cache import invalidate
+from utils.pagination import encode_cursor
+
+CATALOGUE_REPLICA_POLL = float(os.getenv("CATALOGUE_REPLICA_POLL", "2"))
+# Polling sees inserts and updates; a periodic full reload also drops
+# deleted listings and picks up gallery images added after the fact.
+CATALOGUE_REPLICA_FULL_REFRESH = float(os.getenv("CATALOGUE_REPLICA_FULL_REFRESH", "900"))
+# Readers fall back to PostgREST when the replica is older than this
+CATALOGUE_REPLICA_MAX_LAG = float(os.getenv("CATALOGUE_REPLICA_MAX_LAG", "60"))
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _micros(timestamp):
+    """ISO timestamp -> integer microseconds since the epoch (UTC if naive)."""
+    value = datetime.fromisoformat(timestamp)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class _Snapshot:
+    """Immutable column arrays over one version of the catalogue.
+
+    Rows are held newest first by ``(created_at, id)``, the same order as
+    keyset pages from PostgREST.
+    """
+
+    def __init__(self, np, rows, ratings, thumbnails):
+        keyed = sorted(
+            ((_micros(row["created_at"]) if row.get("created_at") else 0, str(row["id"]), row) for row in rows),
+            key=lambda item: item[:2],
+            reverse=True,
+        )
+        rows = [row for _, _, row in keyed]
+        self.np = np
+        self.rows = rows
+        self.position = {row["id"]: i for i, row in enumerate(rows)}
+        self.ids = np.array([row_id for _, row_id, _ in keyed], dtype=str)
+        self.price = np.array(
+            [row["price_per_night"] if row.get("price_per_night") is not None else np.nan for row in rows],
+            dtype=np.float64,
+        )
+        self.category_id = np.array([str(row.get("category_id")) for row in rows], dtype=str)
+        self.rating = np.array([row.get("rating") or 0 for row in rows], dtype=np.float64)
+        self.created_at = np.array([created_at for created_at, _, _ in keyed], dtype=np.int64)
+        self.location = np.array([(row.get("location") or "").lower() for row in rows], dtype=str)
+        self.ratings = ratings
+        self.thumbnails = thumbnails
+
+    def mask(self, category_id=None, min_price=None, max_price=None, location=None,
+             ids=None, exclude_ids=None):
+        np = self.np
+        mask = np.ones(len(self.rows), dtype=bool)
+        if category_id is not None:
+            mask &= self.category_id == str(category_id)
+        if min_price is not None:
+            mask &= self.price >= float(min_price)
+        if max_price is not None:
+            mask &= self.price <= float(max_price)
+        if location:
+            # Same match as ilike '%location%'
+            mask &= np.char.find(self.location, location.lower()) >= 0
+        if ids is not None:
+            mask &= np.isin(self.ids, np.array([str(i) for i in ids], dtype=str))
+        if exclude_ids:
+            mask &= ~np.isin(self.ids, np.array([str(i) for i in exclude_ids], dtype=str))
+        return mask
+
+    def after(self, cursor):
+        """Mask of rows strictly after a decoded ``(created_at, id)`` cursor."""
+        created_at, row_id = cursor
+        created_at = _micros(created_at)
+        return (self.created_at < created_at) | ((self.created_at == created_at) & (self.ids < row_id))
+
+
+class CatalogueReplica:
+    """Read replica of ``properties`` kept in memory as NumPy columns.
+
+    A background thread polls for rows whose ``updated_at`` moved on
+    (and for rating summary changes) and swaps in a new snapshot, so list
+    queries filter and order in process without calling Supabase. Off
+    unless started; ``snapshot()`` returns None until the first load, when
+    stale, or when NumPy is not installed, and callers then query PostgREST.
+    """
+
+    def __init__(self, poll_interval=CATALOGUE_REPLICA_POLL,
+                 full_refresh=CATALOGUE_REPLICA_FULL_REFRESH, max_lag=CATALOGUE_REPLICA_MAX_LAG):
+        self.poll_interval = poll_interval
+        self.full_refresh = full_refresh
+        self.max_lag = max_lag
+        self.enabled = False
+        self._snapshot = None
+        self._synced_at = None
+        self._rows = {}
+        self._ratings = {}
+        self._thumbnails = {}
+        self._rows_since = None
+        self._ratings_since = None
+        self._loaded_at = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._counts = {"polls": 0, "changed_rows": 0, "reloads": 0, "errors": 0}
+
+    def enable(self):
+        """Turn the replica on without starting anything in this process.
+
+        Safe in a gunicorn master that preloads the app: each worker starts
+        its own poller from ``start()`` (post_worker_init) or on first use.
+        """
+        self.enabled = True
+
+    def start(self):
+        """Start this process's poller if the replica is enabled."""
+        if self.enabled:
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork, so each worker runs its own poller
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                logger.warning("CATALOGUE_REPLICA is on but numpy is not installed; reading from Supabase")
+                self.enabled = False
+                return
+            self._pid = os.getpid()
+            self._snapshot = None
+            self._loaded_at = None
+            threading.Thread(target=self._run, name="catalogue-replica", daemon=True).start()
+
+    def snapshot(self):
+        if not self.enabled:
+            return None
+        self._ensure_thread()
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._synced_at > self.max_lag:
+            return None
+        return snapshot
+
+    def notify(self):
+        """Poll now instead of waiting out the interval (after a local write)."""
+        self._wake.set()
+
+    def stats(self):
+        snapshot = self._snapshot
+        return dict(
+            self._counts,
+            enabled=self.enabled,
+            rows=len(snapshot.rows) if snapshot else 0,
+            lag_s=round(time.monotonic() - self._synced_at, 3) if self._synced_at else None,
+        )
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                self._counts["errors"] += 1
+                logger.exception("catalogue replica refresh failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def sync(self):
+        """Pull changes since the last sync and publish a new snapshot if any."""
+        import numpy as np
+
+        full = self._loaded_at is None or time.monotonic() - self._loaded_at >= self.full_refresh
+        if full:
+            self._rows, self._ratings, self._thumbnails = {}, {}, {}
+            self._rows_since = self._ratings_since = None
+
+        changed = self._pull_properties()
+        changed |= self._pull_ratings()
+        self._counts["polls"] += 1
+        if full:
+            self._loaded_at = time.monotonic()
+            self._counts["reloads"] += 1
+        if changed or self._snapshot is None:
+            self._snapshot = _Snapshot(np, list(self._rows.values()), dict(self._ratings), dict(self._thumbnails))
+            # Responses cached since a write may have been built from the
+            # previous snapshot
+            invalidate("properties")
+        self._synced_at = time.monotonic()
+
+    def _pull_properties(self):
+        since = self._rows_since
+
+        def build_query():
+            query = supabase.table("properties").select("*")
+            # gte, not gt: rows sharing the last timestamp may still arrive
+            if since:
+                query = query.gte("updated_at", since)
+            return query.order("updated_at").order("id")
+
+        changed = [
+            row for row in fetch_all(build_query)
+            if self._rows.get(row["id"]) != row
+        ]
+        if not changed:
+            return False
+        for row in changed:
+            self._rows[row["id"]] = row
+            if row.get("updated_at") and (self._rows_since is None or row["updated_at"] > self._rows_since):
+                self._rows_since = row["updated_at"]
+
+        from services.enrichment import first_image_by_property
+
+        missing = [row["id"] for row in changed if not row.get("main_image_url")]
+        if missing:
+            self._thumbnails.update(first_image_by_property(missing))
+        self._counts["changed_rows"] += len(changed)
+        return True
+
+    def _pull_ratings(self):
+        since = self._ratings_since
+
+        def build_query():
+            query = supabase.table(SUMMARY_TABLE).select("property_id, rating_sum, review_count, updated_at")
+            if since:
+                query = query.gte("updated_at", since)
+            return query.order("updated_at").order("property_id")
+
+        changed = False
+        for row in fetch_all(build_query):
+            rating = round(row["rating_sum"] / row["review_count"], 1) if row["review_count"] else None
+            if self._ratings.get(row["property_id"]) != rating:
+                if rating is None:
+                    self._ratings.pop(row["property_id"], None)
+                else:
+                    self._ratings[row["property_id"]] = rating
+                changed = True
+            if row.get("updated_at") and (self._ratings_since is None or row["updated_at"] > self._ratings_since):
+                self._ratings_since = row["updated_at"]
+        return changed
+
+    def select(self, snapshot, order=None, **filters):
+        """Rows matching ``filters``, newest first (or in ``order`` of ids)."""
+        mask = snapshot.mask(**filters)
+        if order is None:
+            return [snapshot.rows[i] for i in snapshot.np.flatnonzero(mask)]
+        position = snapshot.position
+        return [
+            snapshot.rows[position[property_id]]
+            for property_id in order
+            if property_id in position and mask[position[property_id]]
+        ]
+
+    def page(self, snapshot, limit, cursor=None, **filters):
+        """Keyset page matching ``fetch_page``: ``(rows, next_cursor)``."""
+        mask = snapshot.mask(**filters)
+        if cursor:
+            mask &= snapshot.after(cursor)
+        positions = snapshot.np.flatnonzero(mask)[:limit + 1]
+        rows = [snapshot.rows[i] for i in positions[:limit]]
+        return rows, encode_cursor(rows[-1]) if len(positions) > limit else None
+
+    def rows_by_id(self, snapshot, property_ids):
+        position = snapshot.position
+        return [snapshot.rows[position[i]] for i in property_ids if i in position]
+
+    def lookups(self):
+        """Ratings and thumbnails for ``enrich_properties(prefetched=...)``, or None."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        return {"ratings": snapshot.ratings, "thumbnails": snapshot.thumbnails}
+
+
+catalogue_replica = CatalogueReplica()
@@ -0,0 +1,79 @@
+from services.fanout import run_parallel
+from services.queries import fetch_in
+from services.rating_summary import average_ratings
+from services.reference_data import categories
+
+# Card field -> property columns it is built from. Rows are selected with
+# just the columns the requested fields need (see ``card_columns``).
+CARD_FIELDS = {
+    "id": ("id",),
+    "title": ("title",),
+    "location": ("location",),
+    "category": ("category_id",),
+    "price_per_night": ("price_per_night",),
+    "thumbnail": ("main_image_url",),
+    "average_rating": (),
+}
+# Needed for keyset cursors and in-process filters whatever is projected
+_ALWAYS_SELECTED = ("id", "created_at", "category_id")
+
+
+def card_columns(fields=None):
+    """PostgREST ``select`` for building the cards in ``fields`` (None: all)."""
+    if fields is None:
+        return "*"
+    columns = list(_ALWAYS_SELECTED)
+    for field in fields:
+        columns.extend(CARD_FIELDS.get(field, ()))
+    return ", ".join(dict.fromkeys(columns))
+
+
+def first_image_by_property(property_ids):
+    thumbnails = {}
+    for row in fetch_in("property_images", "property_id, image_url", "property_id", property_ids):
+        thumbnails.setdefault(row["property_id"], row["image_url"])
+    return thumbnails
+
+
+def enrich_properties(properties, fields=None, prefetched=None):
+    """Build the listing card payload for ``properties`` with bulk lookups.
+
+    Fallback thumbnails and average ratings (from the rating summary table)
+    are fetched concurrently with one query each, chunked for very large
+    pages, instead of one per row; category names come from the in-process
+    reference cache. With ``fields`` only those card keys are built, and
+    lookups nothing asked for are skipped. ``prefetched`` supplies lookup
+    results already held in memory (see the catalogue replica).
+    """
+    if not properties:
+        return []
+
+    wanted = set(CARD_FIELDS if fields is None else fields)
+    property_ids = [prop["id"] for prop in properties]
+    missing_thumbnail = [prop["id"] for prop in properties if not prop.get("main_image_url")]
+
+    prefetched = prefetched or {}
+    lookups = {}
+    if "average_rating" in wanted and "ratings" not in prefetched:
+        lookups["ratings"] = lambda: average_ratings(property_ids)
+    if missing_thumbnail and "thumbnail" in wanted and "thumbnails" not in prefetched:
+        lookups["thumbnails"] = lambda: first_image_by_property(missing_thumbnail)
+    results = {**prefetched, **run_parallel(lookups)}
+    thumbnails = results.get("thumbnails", {})
+    ratings = results.get("ratings", {})
+
+    cards = [
+        {
+            "id": prop["id"],
+            "title": prop.get("title"),
+            "location": prop.get("location"),
+            "category": categories.name_for(prop.get("category_id")),
+            "price_per_night": prop.get("price_per_night"),
+            "thumbnail": prop.get("main_image_url") or thumbnails.get(prop["id"]),
+            "average_rating": ratings.get(prop["id"]),
+        }
+        for prop in properties
+    ]
+    if fields is not None:
+        cards = [{field: card[field] for field in fields if field in card} for card in cards]
+    return cards
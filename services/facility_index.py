@@ -0,0 +1,67 @@
+import os
+import threading
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.reference_data import facilities
+from services.refresh import Refreshable
+
+FACILITY_INDEX_TTL = float(os.getenv("FACILITY_INDEX_TTL", "300"))
+
+
+def _normalize(name):
+    return (name or "").strip().lower()
+
+
+class FacilityIndex(Refreshable):
+    """Inverted index from facility name to the set of property ids having it.
+
+    Built from ``property_facilities`` in one paged scan and kept current by
+    ``add()``; rebuilt every ``ttl`` seconds to pick up writes made by other
+    workers.
+    """
+
+    def __init__(self, ttl=FACILITY_INDEX_TTL):
+        super().__init__(ttl)
+        self._by_facility = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        rows = fetch_all(
+            lambda: supabase.table("property_facilities")
+            .select("property_id, facility_id")
+            .order("id")
+        )
+        by_facility = {}
+        for row in rows:
+            name = _normalize(facilities.name_for(row["facility_id"]))
+            if name:
+                by_facility.setdefault(name, set()).add(row["property_id"])
+        with self._lock:
+            self._by_facility = by_facility
+
+    def add(self, property_id, facility_ids):
+        with self._lock:
+            if not self.loaded:
+                return
+            for facility_id in facility_ids:
+                name = _normalize(facilities.name_for(facility_id))
+                if name:
+                    self._by_facility.setdefault(name, set()).add(property_id)
+
+    def properties_with_all(self, names):
+        """Return the ids of properties that have every facility in ``names``."""
+        self._ensure_fresh()
+        postings = [self._by_facility.get(_normalize(name), set()) for name in names]
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+
+facility_index = FacilityIndex()
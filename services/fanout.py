@@ -0,0 +1,71 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from services.resilience import UpstreamUnavailable, remaining
+
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "16"))
+FANOUT_DEADLINE = float(os.getenv("FANOUT_DEADLINE", "5"))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+class FanoutTimeout(UpstreamUnavailable, TimeoutError):
+    pass
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    # Threads do not survive fork, so each worker process gets its own pool.
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout"
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _run_marked(fn):
+    _local.in_fanout = True
+    try:
+        return fn()
+    finally:
+        _local.in_fanout = False
+
+
+def run_parallel(calls, deadline=FANOUT_DEADLINE):
+    """Run independent zero-argument callables concurrently.
+
+    ``calls`` maps a name to a callable; the results come back under the same
+    names. Raises FanoutTimeout if any call is still running after
+    ``deadline`` seconds (or when the request's time budget runs out, if
+    sooner), and re-raises the first exception otherwise.
+    Calls made from inside a fan-out task run inline so the bounded pool
+    cannot deadlock on itself.
+    """
+    if getattr(_local, "in_fanout", False) or len(calls) < 2:
+        return {name: fn() for name, fn in calls.items()}
+
+    executor = _get_executor()
+    # Each task runs in a copy of the caller's context so per-request state
+    # (such as upstream call instrumentation) follows it onto the pool.
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_marked, fn)
+        for name, fn in calls.items()
+    }
+    left = remaining()
+    if left is not None:
+        deadline = max(0.0, min(deadline, left))
+    _, pending = wait(futures.values(), timeout=deadline)
+    if pending:
+        for future in pending:
+            future.cancel()
+        late = [name for name, future in futures.items() if future in pending]
+        raise FanoutTimeout(f"Timed out after {deadline:.1f}s waiting for: {', '.join(late)}")
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import threading
+
+from services.reference_data import categories, facilities
+from utils.ttl_cache import TTLCache
+
+FILTER_CACHE_SIZE = int(os.getenv("FILTER_CACHE_SIZE", "2048"))
+FILTER_CACHE_TTL = float(os.getenv("FILTER_CACHE_TTL", "3600"))
+FILTER_MODEL = os.getenv("FILTER_MODEL", "gpt-4-turbo")
+
+SYSTEM_PROMPT = """
+    You are a filter assistant for a property booking app.
+    Given a user's request, extract these fields and return JSON only:
+
+    {
+      "location": "city or town name (optional)",
+      "category": "Apartment | Villa | Cottage | House | Any (optional)",
+      "min_price": 0,
+      "max_price": 5000,
+      "must_have": ["wifi", "pool", ...] (list of desired facility names, optional)
+    }
+
+    Output ONLY valid JSON. Do not include any explanation or formatting.
+    """
+
+# Words that carry no filter meaning; anything else left over after the
+# local parser has matched what it knows sends the query to the model.
+FILLER_WORDS = {
+    "a", "an", "the", "i", "im", "we", "me", "us", "my", "our", "want", "need",
+    "looking", "look", "find", "show", "get", "book", "for", "with", "and",
+    "or", "that", "has", "have", "having", "some", "any", "anywhere",
+    "somewhere", "place", "places", "stay", "stays", "property", "properties",
+    "listing", "listings", "rental", "rentals", "please", "per", "night",
+    "nights", "price", "priced", "budget", "of", "to", "in",
+    "near", "around", "at", "kes", "ksh", "kshs", "usd", "dollars", "shillings",
+}
+LOCATION_STOP_WORDS = {
+    "with", "under", "below", "over", "above", "between", "for", "that",
+    "and", "less", "more", "max", "min", "from", "up", "at", "which",
+}
+
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?k?)"
+_MAX_PRICE = re.compile(rf"\b(?:under|below|less than|max(?:imum)?|up to|cheaper than|at most)\s+\$?{_NUMBER}")
+_MIN_PRICE = re.compile(rf"\b(?:over|above|more than|min(?:imum)?|at least|from)\s+\$?{_NUMBER}")
+_RANGE = re.compile(rf"\bbetween\s+\$?{_NUMBER}\s+and\s+\$?{_NUMBER}|\$?{_NUMBER}\s*(?:-|to)\s*\$?{_NUMBER}")
+_LOCATION = re.compile(r"\b(?:in|near|around)\s+([a-z][a-z' ]*)")
+
+
+class FilterStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"cache_hits": 0, "cache_misses": 0, "fast_path": 0, "llm_calls": 0}
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["cache_hits"] + counts["cache_misses"]
+        counts["hit_rate"] = round(counts["cache_hits"] / lookups, 4) if lookups else 0.0
+        counts["miss_rate"] = round(counts["cache_misses"] / lookups, 4) if lookups else 0.0
+        counts["fast_path_rate"] = round(counts["fast_path"] / counts["cache_misses"], 4) if counts["cache_misses"] else 0.0
+        return counts
+
+
+stats = FilterStats()
+_cache = TTLCache(maxsize=FILTER_CACHE_SIZE, ttl=FILTER_CACHE_TTL)
+
+
+def normalize_query(query):
+    text = re.sub(r"[^\w\s$.,\-']", " ", (query or "").lower())
+    return " ".join(text.split())
+
+
+def _simplify(text):
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", text.lower().replace("-", "")).split())
+
+
+def _parse_number(raw):
+    raw = raw.replace(",", "")
+    multiplier = 1000 if raw.endswith("k") else 1
+    value = float(raw.rstrip("k")) * multiplier
+    return int(value) if value.is_integer() else value
+
+
+def _consume(text, pattern):
+    """Remove every whole-word match of ``pattern`` from ``text``."""
+    regex = re.compile(rf"\b{re.escape(pattern)}s?\b")
+    if not regex.search(text):
+        return text, False
+    return regex.sub(" ", text), True
+
+
+def parse_locally(query):
+    """Extract filters without the model, or return None when unsure."""
+    text = normalize_query(query)
+    filters = {}
+
+    if match := _RANGE.search(text):
+        low, high = [g for g in match.groups() if g]
+        filters["min_price"], filters["max_price"] = _parse_number(low), _parse_number(high)
+        text = text.replace(match.group(0), " ")
+    if match := _MAX_PRICE.search(text):
+        filters["max_price"] = _parse_number(match.group(1))
+        text = text.replace(match.group(0), " ")
+    if match := _MIN_PRICE.search(text):
+        filters["min_price"] = _parse_number(match.group(1))
+        text = text.replace(match.group(0), " ")
+
+    text = _simplify(text)
+
+    for name in sorted(categories.names(), key=len, reverse=True):
+        text, found = _consume(text, _simplify(name))
+        if found:
+            filters["category"] = name
+            break
+
+    must_have = []
+    for name in sorted(facilities.names(), key=len, reverse=True):
+        text, found = _consume(text, _simplify(name))
+        if found:
+            must_have.append(name.strip().lower())
+    if must_have:
+        filters["must_have"] = must_have
+
+    if match := _LOCATION.search(text):
+        words = []
+        for word in match.group(1).split():
+            if word in LOCATION_STOP_WORDS:
+                break
+            words.append(word)
+        if words:
+            filters["location"] = " ".join(words).title()
+            text = text.replace(" ".join(words), " ", 1)
+
+    leftover = [word for word in text.split() if word not in FILLER_WORDS]
+    if leftover or not filters:
+        return None
+    return filters
+
+
+def _messages(query):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": query}
+    ]
+
+
+def _extract_with_model(client, query):
+    response = client.chat.completions.create(
+        model=FILTER_MODEL,
+        messages=_messages(query)
+    )
+    return json.loads(response.choices[0].message.content)
+
+
+def _json_object_end(text):
+    """Index just past the first complete top-level JSON object, or None."""
+    depth, in_string, escaped = 0, False, False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+
+def _extract_with_model_streaming(client, query):
+    # Stop reading as soon as the filter object is complete rather than
+    # waiting for the model to finish the response.
+    stream = client.chat.completions.create(
+        model=FILTER_MODEL,
+        messages=_messages(query),
+        stream=True,
+    )
+    text = ""
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text += chunk.choices[0].delta.content or ""
+            if "}" in text and (end := _json_object_end(text)) is not None:
+                return json.loads(text[text.index("{"):end])
+    finally:
+        stream.close()
+    return json.loads(text)
+
+
+def extract_filters(query, client, stream=False):
+    """Turn a free-text query into the filter dict used by /ai-recommendations.
+
+    Results are cached by normalized query. On a miss the local parser is
+    tried first and the model is only called when it is not confident;
+    ``stream=True`` reads the model's answer with the streaming API.
+    """
+    key = normalize_query(query)
+    cached = _cache.get(key)
+    if cached is not None:
+        stats.incr("cache_hits")
+        return dict(cached)
+    stats.incr("cache_misses")
+
+    filters = parse_locally(query)
+    if filters is not None:
+        stats.incr("fast_path")
+    else:
+        stats.incr("llm_calls")
+        extract = _extract_with_model_streaming if stream else _extract_with_model
+        filters = extract(client, query)
+
+    _cache.set(key, filters)
+    return dict(filters)
@@ -0,0 +1,91 @@
+import os
+import threading
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.refresh import Refreshable
+from services.geocoding import geohash, geohash_cell_size, geohashes_covering, haversine_km
+
+GEO_INDEX_TTL = float(os.getenv("GEO_INDEX_TTL", "300"))
+GEO_MAX_RADIUS_KM = float(os.getenv("GEO_MAX_RADIUS_KM", "500"))
+
+# Buckets are kept at several geohash precisions (~156km, ~39km, ~4.9km
+# cells); a query uses the finest one that covers its circle in few cells.
+PRECISIONS = (3, 4, 5)
+MAX_CELLS_PER_QUERY = 64
+
+
+class GeoIndex(Refreshable):
+    """Geohash bucket index over property coordinates.
+
+    Built from ``properties.latitude/longitude`` in one paged scan, kept
+    current by ``add()`` and rebuilt every ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=GEO_INDEX_TTL):
+        super().__init__(ttl)
+        self._points = {}
+        self._buckets = {precision: {} for precision in PRECISIONS}
+        self._lock = threading.Lock()
+
+    def _insert(self, points, buckets, property_id, lat, lon):
+        points[property_id] = (lat, lon)
+        code = geohash(lat, lon, max(PRECISIONS))
+        for precision in PRECISIONS:
+            buckets[precision].setdefault(code[:precision], set()).add(property_id)
+
+    def _load(self):
+        rows = fetch_all(
+            lambda: supabase.table("properties")
+            .select("id, latitude, longitude")
+            .not_.is_("latitude", "null")
+            .order("id")
+        )
+        points, buckets = {}, {precision: {} for precision in PRECISIONS}
+        for row in rows:
+            if row.get("latitude") is not None and row.get("longitude") is not None:
+                self._insert(points, buckets, row["id"], float(row["latitude"]), float(row["longitude"]))
+        with self._lock:
+            self._points, self._buckets = points, buckets
+
+    def add(self, property_id, lat, lon):
+        if lat is None or lon is None:
+            return
+        with self._lock:
+            if not self.loaded:
+                return
+            old = self._points.get(property_id)
+            if old is not None:
+                code = geohash(*old, max(PRECISIONS))
+                for precision in PRECISIONS:
+                    self._buckets[precision].get(code[:precision], set()).discard(property_id)
+            self._insert(self._points, self._buckets, property_id, float(lat), float(lon))
+
+    def _precision_for(self, lat, radius_km):
+        for precision in reversed(PRECISIONS):
+            cell_lat, cell_lon = geohash_cell_size(precision)
+            cell_km = min(cell_lat, cell_lon) * 111.0
+            if (2 * radius_km / cell_km + 1) ** 2 <= MAX_CELLS_PER_QUERY:
+                return precision
+        return PRECISIONS[0]
+
+    def nearest(self, lat, lon, radius_km, limit=None):
+        """Return ``[(property_id, distance_km)]`` within ``radius_km``, nearest first."""
+        self._ensure_fresh()
+        radius_km = min(radius_km, GEO_MAX_RADIUS_KM)
+        precision = self._precision_for(lat, radius_km)
+        buckets, points = self._buckets[precision], self._points
+        found = []
+        for cell in geohashes_covering(lat, lon, radius_km, precision):
+            for property_id in buckets.get(cell, ()):
+                point = points.get(property_id)
+                if point is None:
+                    continue
+                distance = haversine_km(lat, lon, *point)
+                if distance <= radius_km:
+                    found.append((property_id, round(distance, 3)))
+        found.sort(key=lambda item: item[1])
+        return found[:limit] if limit else found
+
+
+geo_index = GeoIndex()
@@ -0,0 +1,145 @@
+import csv
+import math
+import os
+import re
+import threading
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "kenya_towns.csv"),
+)
+
+EARTH_RADIUS_KM = 6371.0088
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash(lat, lon, precision):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    """Return ``(lat_degrees, lon_degrees)`` spanned by one cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bounding_box(lat, lon, radius_km):
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, dlat / cos_lat)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def geohashes_covering(lat, lon, radius_km, precision):
+    """Geohash cells of ``precision`` that together cover the search circle."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    cells = set()
+    y = max(min_lat, -90.0)
+    while True:
+        x = min_lon
+        while True:
+            cells.add(geohash(y, (x + 180.0) % 360.0 - 180.0, precision))
+            if x >= max_lon:
+                break
+            x = min(x + cell_lon, max_lon)
+        if y >= min(max_lat, 90.0):
+            break
+        y = min(y + cell_lat, max_lat, 90.0)
+    return cells
+
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower().replace("'", "")).strip()
+
+
+class Gazetteer:
+    """Offline place-name lookup backed by a CSV of towns and their aliases."""
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._places = None
+        self._by_name = None
+
+    def _load(self):
+        if self._places is not None:
+            return
+        with self._lock:
+            if self._places is not None:
+                return
+            places, by_name = [], {}
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    place = {
+                        "name": row["name"],
+                        "latitude": float(row["latitude"]),
+                        "longitude": float(row["longitude"]),
+                    }
+                    places.append(place)
+                    for name in [row["name"], *(row.get("aliases") or "").split("|")]:
+                        if _normalize(name):
+                            by_name.setdefault(_normalize(name), place)
+            self._by_name = by_name
+            self._places = places
+
+    def places(self):
+        self._load()
+        return list(self._places)
+
+    def lookup(self, text):
+        """Return the gazetteer place named in ``text``, or None.
+
+        An exact name or alias wins; otherwise the longest known name that
+        appears as whole words in ``text`` (e.g. "Beach house, Diani").
+        """
+        self._load()
+        normalized = _normalize(text)
+        if not normalized:
+            return None
+        if normalized in self._by_name:
+            return self._by_name[normalized]
+        padded = f" {normalized} "
+        for name in sorted(self._by_name, key=len, reverse=True):
+            if f" {name} " in padded:
+                return self._by_name[name]
+        return None
+
+    def geocode(self, text):
+        place = self.lookup(text)
+        return (place["latitude"], place["longitude"]) if place else None
+
+
+gazetteer = Gazetteer()
+
+
+def coordinates_for(location, latitude=None, longitude=None):
+    """Explicit coordinates when both are given, else the gazetteer's guess."""
+    if latitude is not None and longitude is not None:
+        return float(latitude), float(longitude)
+    return gazetteer.geocode(location) or (None, None)
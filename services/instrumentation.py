@@ -0,0 +1,172 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import Response, g, request
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+
+logger = logging.getLogger("staysavvy.instrumentation")
+
+_START_KEY = "staysavvy_started_at"
+_current_calls = ContextVar("upstream_calls", default=None)
+
+
+class _RequestCalls:
+    """Upstream calls made while serving one request (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def add(self, dependency, label, seconds):
+        with self._lock:
+            self.calls.append((dependency, label, seconds))
+
+    def by_dependency(self):
+        totals = {}
+        with self._lock:
+            for dependency, _, seconds in self.calls:
+                count, total = totals.get(dependency, (0, 0.0))
+                totals[dependency] = (count + 1, total + seconds)
+        return totals
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                base = ",".join(
+                    f'{name}="{label}"' for name, label in zip(self.label_names, labels)
+                )
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{base}}} {total}")
+                lines.append(f"{self.name}_count{{{base}}} {count}")
+        return "\n".join(lines)
+
+
+request_duration = Histogram(
+    "staysavvy_request_duration_seconds",
+    "Time spent serving a request.",
+    ("endpoint", "method", "status"),
+)
+upstream_duration = Histogram(
+    "staysavvy_upstream_call_duration_seconds",
+    "Duration of individual upstream calls.",
+    ("endpoint", "dependency"),
+)
+upstream_calls = Histogram(
+    "staysavvy_upstream_calls_per_request",
+    "Number of upstream calls made per request.",
+    ("endpoint", "dependency"),
+    buckets=CALL_COUNT_BUCKETS,
+)
+
+
+def _label_for(http_request):
+    path = http_request.url.path.rstrip("/")
+    return f"{http_request.method} {path.rsplit('/', 1)[-1] or path}"
+
+
+def instrument_httpx_client(client, dependency):
+    """Time every request sent through an httpx client for the current request."""
+    if getattr(client, "_staysavvy_instrumented", False):
+        return client
+
+    def on_request(http_request):
+        http_request.extensions[_START_KEY] = time.perf_counter()
+
+    def on_response(http_response):
+        started = http_response.request.extensions.get(_START_KEY)
+        calls = _current_calls.get()
+        if started is None or calls is None:
+            return
+        calls.add(dependency, _label_for(http_response.request), time.perf_counter() - started)
+
+    hooks = client.event_hooks
+    hooks["request"] = list(hooks.get("request", [])) + [on_request]
+    hooks["response"] = list(hooks.get("response", [])) + [on_response]
+    client.event_hooks = hooks
+    client._staysavvy_instrumented = True
+    return client
+
+
+def _start_request():
+    g._upstream_started_at = time.perf_counter()
+    g._upstream_calls = _RequestCalls()
+    _current_calls.set(g._upstream_calls)
+
+
+def _finish_request(response):
+    calls = g.pop("_upstream_calls", None)
+    started = g.pop("_upstream_started_at", None)
+    if calls is None or started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or "unknown"
+    totals = calls.by_dependency()
+
+    request_duration.observe(elapsed, endpoint, request.method, str(response.status_code))
+    for dependency, _, seconds in list(calls.calls):
+        upstream_duration.observe(seconds, endpoint, dependency)
+    for dependency in ("supabase", "openai"):
+        upstream_calls.observe(totals.get(dependency, (0, 0.0))[0], endpoint, dependency)
+
+    timings = [
+        f'{dependency};dur={total * 1000:.1f};desc="{count} calls"'
+        for dependency, (count, total) in sorted(totals.items())
+    ]
+    timings.append(f"app;dur={elapsed * 1000:.1f}")
+    response.headers["Server-Timing"] = ", ".join(timings)
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        breakdown = "; ".join(
+            f"{dependency} {label} {seconds * 1000:.1f}ms"
+            for dependency, label, seconds in calls.calls
+        )
+        logger.warning(
+            "Slow request %s %s took %.1fms with %d upstream calls: %s",
+            request.method, request.path, elapsed * 1000, len(calls.calls), breakdown,
+        )
+    return response
+
+
+def _reset_request(exc=None):
+    _current_calls.set(None)
+
+
+def metrics():
+    body = "\n".join(h.render() for h in (request_duration, upstream_duration, upstream_calls))
+    return Response(body + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_reset_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
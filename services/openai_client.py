@@ -0,0 +1,75 @@
+import importlib
+import os
+import threading
+
+from services.instrumentation import instrument_httpx_client
+from services.resilience import resilient_transport
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "20"))
+
+
+class OpenAIUnavailable(RuntimeError):
+    pass
+
+
+class OpenAIClient:
+    """Builds the OpenAI client on first use, once per process.
+
+    Importing the SDK and creating the client is deferred until a request
+    actually needs the model, so workers that never call it never pay for
+    it, and a missing API key only fails those requests.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _client = None
+    api_key = OPENAI_API_KEY
+    base_url = OPENAI_BASE_URL
+
+    @classmethod
+    def configure(cls, api_key=None, base_url=None):
+        with cls._lock:
+            cls.api_key = api_key
+            cls.base_url = base_url
+            cls._client = None
+            cls._pid = None
+
+    def get_client(self):
+        cls = type(self)
+        if cls._pid == os.getpid() and cls._client is not None:
+            return cls._client
+        with cls._lock:
+            if cls._pid != os.getpid() or cls._client is None:
+                if not cls.api_key:
+                    raise OpenAIUnavailable("OPENAI_API_KEY is not set")
+                from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI
+
+                # The SDK's own httpx package (it may ship a compatible fork)
+                client_class = next(base for base in DefaultHttpxClient.__mro__ if base.__name__ == "Client")
+                httpx = importlib.import_module(client_class.__module__.split(".")[0])
+                # An explicit transport replaces the default pool, so it gets the SDK's limits
+                transport = httpx.HTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+                http_client = DefaultHttpxClient(transport=resilient_transport(transport, "openai"))
+                cls._client = OpenAI(
+                    api_key=cls.api_key,
+                    base_url=cls.base_url,
+                    # Completions are not retried (they are POSTs), and the
+                    # request's time budget caps the wait below this
+                    timeout=OPENAI_TIMEOUT,
+                    max_retries=0,
+                    http_client=instrument_httpx_client(http_client, "openai"),
+                )
+                cls._pid = os.getpid()
+            return cls._client
+
+
+class _ClientProxy:
+    """Module-level ``openai`` that resolves to this process's client."""
+
+    def __getattr__(self, name):
+        return getattr(OpenAIClient().get_client(), name)
+
+
+openai = _ClientProxy()
@@ -0,0 +1,30 @@
+from services.supabase_client import supabase
+
+# PostgREST caps responses at max-rows (1000 on Supabase) and long `in.(...)`
+# lists can overflow proxy URL limits, so bulk reads are paged and chunked.
+PAGE_SIZE = 1000
+IN_CHUNK_SIZE = 150
+
+
+def fetch_all(build_query, page_size=PAGE_SIZE):
+    """Run ``build_query()`` page by page and return every row."""
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+def fetch_in(table, columns, column, values, chunk_size=IN_CHUNK_SIZE):
+    """Select ``columns`` from ``table`` where ``column`` is in ``values``."""
+    values = list(dict.fromkeys(v for v in values if v is not None))
+    rows = []
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i:i + chunk_size]
+        rows.extend(
+            fetch_all(lambda: supabase.table(table).select(columns).in_(column, chunk))
+        )
+    return rows
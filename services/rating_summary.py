@@ -0,0 +1,21 @@
+from services.supabase_client import supabase
+from services.queries import fetch_in
+
+# Maintained by the reviews trigger in
+# supabase/migrations/20261018090000_property_rating_summary.sql
+SUMMARY_TABLE = "property_rating_summary"
+
+
+def average_ratings(property_ids):
+    """Return ``{property_id: average_rating}`` from the summary table."""
+    rows = fetch_in(SUMMARY_TABLE, "property_id, rating_sum, review_count", "property_id", property_ids)
+    return {
+        row["property_id"]: round(row["rating_sum"] / row["review_count"], 1)
+        for row in rows
+        if row["review_count"]
+    }
+
+
+def rebuild():
+    """Recompute every aggregate from the reviews table; returns the row count."""
+    return supabase.rpc("rebuild_property_rating_summary").execute().data
@@ -0,0 +1,77 @@
+import os
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.refresh import Refreshable
+
+REFERENCE_DATA_TTL = float(os.getenv("REFERENCE_DATA_TTL", "600"))
+
+
+class ReferenceTable(Refreshable):
+    """In-process copy of a small lookup table with id and name indexes,
+    reloaded every ``ttl`` seconds.
+    """
+
+    def __init__(self, table, ttl=REFERENCE_DATA_TTL):
+        super().__init__(ttl)
+        self.table = table
+        self._rows = []
+        self._by_id = {}
+        self._by_text_id = {}
+        self._by_name = {}
+
+    def _load(self):
+        rows = fetch_all(lambda: supabase.table(self.table).select("*"))
+        self._rows = rows
+        self._by_id = {row["id"]: row for row in rows}
+        # CSV and query strings carry ids as text ("3" for 3)
+        self._by_text_id = {str(row["id"]): row for row in rows}
+        self._by_name = {
+            row["name"].strip().lower(): row for row in rows if row.get("name")
+        }
+
+    def all(self):
+        self._ensure_fresh()
+        return list(self._rows)
+
+    def get(self, row_id):
+        self._ensure_fresh()
+        row = self._by_id.get(row_id)
+        if row is None and row_id is not None:
+            row = self._by_text_id.get(str(row_id))
+        return row
+
+    def key_for(self, row_id):
+        """``row_id`` as the table's own id value, or None if unknown."""
+        row = self.get(row_id)
+        return row["id"] if row else None
+
+    def name_for(self, row_id):
+        row = self.get(row_id)
+        return row["name"] if row else None
+
+    def id_for(self, name):
+        self._ensure_fresh()
+        row = self._by_name.get((name or "").strip().lower())
+        return row["id"] if row else None
+
+    def find_id(self, fragment):
+        """Case-insensitive substring match, like ``ilike '%fragment%'``."""
+        fragment = (fragment or "").strip().lower()
+        if not fragment:
+            return None
+        exact = self.id_for(fragment)
+        if exact is not None:
+            return exact
+        for name, row in self._by_name.items():
+            if fragment in name:
+                return row["id"]
+        return None
+
+    def names(self):
+        self._ensure_fresh()
+        return [row["name"] for row in self._by_name.values()]
+
+
+categories = ReferenceTable("category")
+facilities = ReferenceTable("facilities")
@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+import time
+import weakref
+
+from services.resilience import DeadlineExceeded, remaining
+
+logger = logging.getLogger(__name__)
+
+_instances = weakref.WeakSet()
+
+
+class Refreshable:
+    """Base for in-process copies of upstream data that expire after ``ttl``.
+
+    Subclasses implement ``_load()``, which fetches the data and swaps the
+    new copy in, and call ``_ensure_fresh()`` before reading. The copy is
+    reloaded once ``ttl`` seconds have passed or after ``invalidate()``.
+
+    Loads run on a background thread, outside any request's time budget:
+    readers keep getting the current copy while a reload runs, and only the
+    first load is waited for (up to the request's remaining budget). If a
+    reload fails the previous copy keeps being served until the next
+    attempt, one ``ttl`` later.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._loaded_at = None
+        self._expired = False
+        self._refresh_lock = threading.Lock()
+        self._running = None
+        self._running_pid = None
+        self._error = None
+        _instances.add(self)
+
+    def _load(self):
+        raise NotImplementedError
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def _mark_loaded(self):
+        self._loaded_at = time.monotonic()
+        self._expired = False
+
+    def _is_stale(self):
+        return (
+            self._loaded_at is None
+            or self._expired
+            or time.monotonic() - self._loaded_at >= self.ttl
+        )
+
+    def _ensure_fresh(self):
+        if not self._is_stale():
+            return
+        done = self._start_refresh()
+        if self.loaded:
+            return
+        # Nothing to serve yet; the load carries on if this request gives up
+        if not done.wait(remaining()):
+            raise DeadlineExceeded(f"{type(self).__name__} is still loading")
+        if not self.loaded:
+            raise self._error
+
+    def _start_refresh(self):
+        """Start a background refresh unless one is running; returns its Event."""
+        with self._refresh_lock:
+            # A refresh thread started before a fork does not exist in the child
+            if self._running is None or self._running_pid != os.getpid():
+                self._running = threading.Event()
+                self._running_pid = os.getpid()
+                threading.Thread(
+                    target=self._refresh_in_background,
+                    args=(self._running,),
+                    name=f"refresh-{type(self).__name__}",
+                    daemon=True,
+                ).start()
+            return self._running
+
+    def _refresh_in_background(self, done):
+        try:
+            self.refresh()
+            self._error = None
+        except Exception as e:
+            self._error = e
+            logger.warning("loading %s failed: %s", type(self).__name__, e)
+        finally:
+            with self._refresh_lock:
+                self._running = None
+            done.set()
+
+    def refresh(self):
+        """Reload now in this thread, keeping the current copy if the load fails."""
+        try:
+            self._load()
+        except Exception:
+            if self._loaded_at is None:
+                raise
+            logger.exception("refreshing %s failed; serving the previous copy", type(self).__name__)
+        self._mark_loaded()
+
+    def invalidate(self):
+        """Reload on next use."""
+        self._expired = True
+
+
+def warm_up():
+    """Start loading every in-process copy in the background (worker start)."""
+    for instance in list(_instances):
+        if instance._is_stale():
+            instance._start_refresh()
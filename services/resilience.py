@@ -0,0 +1,308 @@
+import importlib
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import jsonify
+
+REQUEST_TIME_BUDGET = float(os.getenv("REQUEST_TIME_BUDGET", "10"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.05"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "1"))
+
+# Safe to resend: reads only. Writes go through idempotency keys instead.
+RETRYABLE_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRYABLE_STATUSES = {502, 503, 504}
+
+logger = logging.getLogger("staysavvy.resilience")
+
+_deadline = ContextVar("deadline", default=None)
+_failures = ContextVar("upstream_failures", default=None)
+_failures_lock = threading.Lock()
+
+
+class UpstreamUnavailable(RuntimeError):
+    """An upstream call was refused (open breaker) or ran out of time."""
+
+    retry_after = 1
+
+
+class CircuitOpen(UpstreamUnavailable):
+    def __init__(self, breaker):
+        super().__init__(f"{breaker.name} is unavailable (circuit open)")
+        self.retry_after = breaker.retry_after()
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    calls fail fast for ``reset_timeout`` seconds; then one trial call is
+    let through (half open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._counts = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self):
+        with self._lock:
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpen(self)
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._trial_running:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpen(self)
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self._counts["successes"] += 1
+            self._failures = 0
+            self._trial_running = False
+            if self._state != "closed":
+                logger.info("circuit %s closed", self.name)
+            self._state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._counts["failures"] += 1
+            self._failures += 1
+            self._trial_running = False
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._counts["opened"] += 1
+                logger.warning("circuit %s opened after %d failures", self.name, self._failures)
+
+    def release(self):
+        """End a call without counting it as a success or a failure."""
+        with self._lock:
+            self._trial_running = False
+
+    def retry_after(self):
+        """Seconds until an open breaker lets a trial call through."""
+        if self._state != "open":
+            return 0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def snapshot(self):
+        with self._lock:
+            state = self._state
+            if state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                state = "half_open"
+            return dict(
+                self._counts,
+                state=state,
+                consecutive_failures=self._failures,
+                retry_after=round(self.retry_after(), 1) if state == "open" else 0,
+            )
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(dependency):
+    with _breakers_lock:
+        breaker = _breakers.get(dependency)
+        if breaker is None:
+            breaker = _breakers[dependency] = CircuitBreaker(dependency)
+        return breaker
+
+
+# -- per-request state
+
+
+def remaining():
+    """Seconds left in the current request's budget, or None outside one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def upstream_failed():
+    """True once any upstream call in this request failed or was refused."""
+    return bool(_failures.get())
+
+
+def _record_failure(dependency):
+    """Note a failed call; False if ``dependency`` already failed in this request."""
+    failures = _failures.get()
+    if failures is None:
+        return True
+    with _failures_lock:
+        first = dependency not in failures
+        failures.append(dependency)
+    return first
+
+
+def _fail(breaker, dependency):
+    # Fan-out legs of one request failing together count as one failure
+    if _record_failure(dependency):
+        breaker.record_failure()
+    else:
+        breaker.release()
+
+
+@contextmanager
+def budget(seconds):
+    """Allow ``seconds`` for the upstream calls made inside the block."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_budget(seconds):
+    """Give a view ``seconds`` for all its upstream calls (overrides the default)."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with budget(seconds):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _start_request():
+    _deadline.set(time.monotonic() + REQUEST_TIME_BUDGET)
+    # A list, not a flag, so fan-out tasks (running in context copies) share it
+    _failures.set([])
+
+
+def _reset_request(exc=None):
+    _deadline.set(None)
+    _failures.set(None)
+
+
+# -- transport
+
+
+def _capped_timeouts(timeouts, seconds):
+    return {name: seconds if value is None else min(value, seconds) for name, value in timeouts.items()}
+
+
+def _is_capped(timeouts, seconds):
+    """True when ``seconds`` is shorter than a timeout the call would have had."""
+    return not timeouts or any(value is None or value > seconds for value in timeouts.values())
+
+
+def resilient_transport(transport, dependency):
+    """Wrap an httpx transport with the dependency's breaker, the request
+    deadline and jittered retries for idempotent requests."""
+    # The transport's own package: SDKs may ship an httpx-compatible fork
+    httpx = importlib.import_module(type(transport).__module__.split(".")[0])
+
+    class ResilientTransport(httpx.BaseTransport):
+        def handle_request(self, request):
+            breaker = breaker_for(dependency)
+            attempts = RETRY_ATTEMPTS if request.method in RETRYABLE_METHODS else 1
+            timeouts = request.extensions.get("timeout", {})
+            left = remaining()
+            if left is not None and left <= 0:
+                _record_failure(dependency)
+                raise DeadlineExceeded(f"Time budget exhausted before calling {dependency}")
+            # One breaker outcome per call, however many attempts it takes
+            try:
+                breaker.before_call()
+            except CircuitOpen:
+                _record_failure(dependency)
+                raise
+
+            for attempt in range(attempts):
+                left = remaining()
+                capped = left is not None and _is_capped(timeouts, left)
+                if left is not None:
+                    request.extensions["timeout"] = _capped_timeouts(timeouts, max(left, 0.0))
+
+                last = attempt == attempts - 1
+                try:
+                    response = transport.handle_request(request)
+                except httpx.TransportError as e:
+                    if not last and _backoff(attempt):
+                        continue
+                    if isinstance(e, httpx.TimeoutException) and capped:
+                        # Cut short by our own budget: says nothing about the upstream
+                        breaker.release()
+                        _record_failure(dependency)
+                        raise DeadlineExceeded(f"Time budget ran out waiting for {dependency}") from e
+                    _fail(breaker, dependency)
+                    if isinstance(e, (httpx.TimeoutException, httpx.NetworkError)):
+                        raise UpstreamUnavailable(f"{dependency} is unavailable: {e}") from e
+                    raise
+
+                if response.status_code not in RETRYABLE_STATUSES:
+                    breaker.record_success()
+                    return response
+                if last or not _backoff(attempt):
+                    _fail(breaker, dependency)
+                    return response
+                response.close()
+
+        def close(self):
+            transport.close()
+
+    return ResilientTransport()
+
+
+def _backoff(attempt):
+    """Sleep a full-jitter backoff; False when the budget cannot cover it."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    budget = remaining()
+    if budget is not None and delay >= budget:
+        return False
+    time.sleep(delay)
+    return True
+
+
+def unavailable_response(message, retry_after=0):
+    """503 telling the client when to retry (at least one second)."""
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(max(1, round(retry_after)))
+    return response
+
+
+def _handle_unavailable(error):
+    return unavailable_response(str(error), error.retry_after)
+
+
+def breaker_states():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return jsonify({name: breaker.snapshot() for name, breaker in sorted(breakers.items())}), 200
+
+
+def init_app(app):
+    for dependency in ("supabase", "openai"):
+        breaker_for(dependency)
+    app.before_request(_start_request)
+    app.teardown_request(_reset_request)
+    app.register_error_handler(UpstreamUnavailable, _handle_unavailable)
+    app.add_url_rule("/health/breakers", "breaker_states", breaker_states)
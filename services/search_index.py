@@ -0,0 +1,231 @@
+import heapq
+import math
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+
+from services.supabase_client import supabase
+from services.queries import fetch_all
+from services.refresh import Refreshable
+
+SEARCH_INDEX_TTL = float(os.getenv("SEARCH_INDEX_TTL", "600"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+FIELD_WEIGHTS = {"title": 2.0, "location": 1.5, "description": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_MAX_EXPANSIONS = 3
+PREFIX_MAX_EXPANSIONS = 20
+TERMS_INSERT_MAX = 32
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or "").lower())
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex(Refreshable):
+    """In-process BM25 index over property title, location and description.
+
+    Query terms missing from the vocabulary are expanded to similar terms by
+    trigram similarity (typo tolerance), and with ``prefix=True`` the last
+    term also matches every vocabulary term it starts (autocomplete).
+    Rebuilt from ``properties`` every ``ttl`` seconds and updated
+    incrementally by ``add()``.
+    """
+
+    def __init__(self, ttl=SEARCH_INDEX_TTL):
+        super().__init__(ttl)
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}
+        self._doc_lengths = {}
+        self._doc_terms = {}
+        self._docs = {}
+        self._categories = {}
+        self._total_length = 0.0
+        self._terms = []
+        self._trigram_terms = {}
+
+    # -- building
+
+    @staticmethod
+    def _analyze(row):
+        frequencies = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row.get(field)):
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+                length += weight
+        return frequencies, length
+
+    def _insert(self, row, frequencies, length, average_length, new_terms):
+        # Postings hold the BM25 saturated term frequency so a query only
+        # multiplies by idf. Incremental adds use the current average length;
+        # the next rebuild normalises every document exactly.
+        doc_id = row["id"]
+        if doc_id in self._docs:
+            self._remove(doc_id)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (average_length or 1.0))
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.append(term)
+                for gram in trigrams(term):
+                    self._trigram_terms.setdefault(gram, set()).add(term)
+            postings[doc_id] = frequency * (BM25_K1 + 1) / (frequency + norm)
+        self._doc_terms[doc_id] = list(frequencies)
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._docs[doc_id] = {"id": doc_id, "title": row.get("title"), "location": row.get("location")}
+        self._categories[doc_id] = row.get("category_id")
+
+    def _merge_terms(self, new_terms):
+        # A list insert shifts the whole vocabulary, so a batch with many new
+        # terms is merged in one pass instead (timsort merges the two sorted
+        # runs); a handful are cheaper to insert one by one.
+        new_terms = sorted({term for term in new_terms if term in self._postings})
+        if len(new_terms) > TERMS_INSERT_MAX:
+            self._terms = sorted(self._terms + new_terms)
+            return
+        for term in new_terms:
+            insort(self._terms, term)
+
+    def _remove(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if postings:
+                continue
+            # Last document with this term: drop it from the vocabulary
+            del self._postings[term]
+            index = bisect_left(self._terms, term)
+            # Terms added earlier in the same batch are not merged in yet
+            if index < len(self._terms) and self._terms[index] == term:
+                del self._terms[index]
+            for gram in trigrams(term):
+                terms = self._trigram_terms.get(gram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._trigram_terms[gram]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+        self._docs.pop(doc_id, None)
+        self._categories.pop(doc_id, None)
+
+    def load(self, rows):
+        analyzed = [(row, *self._analyze(row)) for row in rows]
+        average_length = sum(length for _, _, length in analyzed) / max(len(analyzed), 1)
+        with self._lock:
+            self._reset()
+            new_terms = []
+            for row, frequencies, length in analyzed:
+                self._insert(row, frequencies, length, average_length, new_terms)
+            self._merge_terms(new_terms)
+            self._mark_loaded()
+
+    def _load(self):
+        rows = fetch_all(
+            lambda: supabase.table("properties")
+            .select("id, title, location, description, category_id")
+            .order("id")
+        )
+        self.load(rows)
+
+    def add(self, row):
+        self.add_many([row])
+
+    def add_many(self, rows):
+        analyzed = [(row, *self._analyze(row)) for row in rows]
+        with self._lock:
+            if not self.loaded:
+                return
+            average_length = self._total_length / max(len(self._docs), 1)
+            new_terms = []
+            for row, frequencies, length in analyzed:
+                self._insert(row, frequencies, length, average_length, new_terms)
+            self._merge_terms(new_terms)
+
+    # -- querying
+
+    def _fuzzy_terms(self, term):
+        grams = trigrams(term)
+        shared = {}
+        for gram in grams:
+            for candidate in self._trigram_terms.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = []
+        for candidate, count in shared.items():
+            similarity = count / len(grams | trigrams(candidate))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, candidate))
+        scored.sort(reverse=True)
+        return [(candidate, similarity) for similarity, candidate in scored[:FUZZY_MAX_EXPANSIONS]]
+
+    def _prefix_terms(self, prefix):
+        start = bisect_left(self._terms, prefix)
+        matches = []
+        for term in self._terms[start:start + PREFIX_MAX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            matches.append((term, 1.0 if term == prefix else 0.8))
+        return matches
+
+    def _expand(self, query, prefix):
+        terms = tokenize(query)
+        expanded = []
+        for position, term in enumerate(terms):
+            if prefix and position == len(terms) - 1:
+                options = self._prefix_terms(term)
+            elif term in self._postings:
+                options = [(term, 1.0)]
+            else:
+                options = self._fuzzy_terms(term)
+            expanded.append(options)
+        return expanded
+
+    def search(self, query, limit=SEARCH_MAX_RESULTS, prefix=False, where=None):
+        """Return ``[(property_id, score)]`` ordered by descending relevance.
+
+        ``where(property_id, category_id)`` drops matches before the
+        ``limit`` cut, so filtered searches still get ``limit`` results.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return []
+            scores = {}
+            get = scores.get
+            for options in self._expand(query, prefix):
+                for term, boost in options:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    weight = boost * math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, saturation in postings.items():
+                        scores[doc_id] = get(doc_id, 0.0) + weight * saturation
+            if where is not None:
+                categories = self._categories
+                scores = {doc_id: score for doc_id, score in scores.items() if where(doc_id, categories.get(doc_id))}
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def suggest(self, query, limit=10):
+        """Autocomplete: best matching listings treating the last word as a prefix."""
+        results = self.search(query, limit=limit, prefix=True)
+        with self._lock:
+            return [dict(self._docs[doc_id], score=round(score, 4)) for doc_id, score in results if doc_id in self._docs]
+
+
+search_index = SearchIndex()
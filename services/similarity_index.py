@@ -0,0 +1,250 @@
+import math
+import os
+import threading
+import zlib
+
+from services.supabase_client import supabase
+from services.queries import fetch_all, fetch_in
+from services.reference_data import categories, facilities
+from services.refresh import Refreshable
+from services.search_index import tokenize
+
+SIMILARITY_INDEX_TTL = float(os.getenv("SIMILARITY_INDEX_TTL", "900"))
+# Hashed TF-IDF width; one more column carries the normalized price
+SIMILARITY_DIMENSIONS = int(os.getenv("SIMILARITY_DIMENSIONS", "256"))
+SIMILARITY_PRICE_WEIGHT = float(os.getenv("SIMILARITY_PRICE_WEIGHT", "0.3"))
+
+FIELD_WEIGHTS = {"title": 2.0, "description": 1.0}
+CATEGORY_WEIGHT = 2.0
+FACILITY_WEIGHT = 1.5
+
+# Random-hyperplane LSH: a listing lands in one bucket per table, keyed by
+# which side of each hyperplane its vector falls on. Candidates from the
+# query's buckets (and those one bit away) are re-ranked exactly.
+LSH_TABLES = 8
+LSH_BITS = 12
+LSH_SEED = 7
+MIN_CANDIDATES = 200
+
+
+class SimilarityUnavailable(RuntimeError):
+    pass
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SimilarityUnavailable("Similar properties need numpy installed")
+    return numpy
+
+
+def _features(row, facility_names):
+    """Weighted term counts for one listing."""
+    counts = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(row.get(field)):
+            counts[token] = counts.get(token, 0.0) + weight
+    category = categories.name_for(row.get("category_id"))
+    if category:
+        key = "category:" + category.lower()
+        counts[key] = counts.get(key, 0.0) + CATEGORY_WEIGHT
+    for name in facility_names:
+        key = "facility:" + name.lower()
+        counts[key] = counts.get(key, 0.0) + FACILITY_WEIGHT
+    return counts
+
+
+def _bucket(term):
+    code = zlib.crc32(term.encode())
+    return code % SIMILARITY_DIMENSIONS, 1.0 if code & 0x80000000 else -1.0
+
+
+class SimilarityIndex(Refreshable):
+    """Nearest-neighbour index over listing vectors.
+
+    Each listing is a hashed TF-IDF vector of its title, description,
+    category and facilities plus a log-price column, L2 normalized so that
+    cosine similarity is a dot product. Vectors live in one NumPy matrix
+    (grown by doubling); ``add()`` appends with the current IDF weights and
+    the index is rebuilt every ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=SIMILARITY_INDEX_TTL):
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self._planes = None
+        self._reset()
+
+    def _reset(self):
+        self._matrix = None
+        self._ids = []
+        self._positions = {}
+        self._tables = [{} for _ in range(LSH_TABLES)]
+        self._document_frequency = {}
+        self._doc_count = 0
+        self._price_mean = 0.0
+        self._price_std = 1.0
+
+    # -- building
+
+    def _vector(self, np, counts, price):
+        vector = np.zeros(SIMILARITY_DIMENSIONS + 1, dtype=np.float32)
+        for term, count in counts.items():
+            document_frequency = self._document_frequency.get(term, 0)
+            idf = math.log((1 + self._doc_count) / (1 + document_frequency)) + 1
+            column, sign = _bucket(term)
+            vector[column] += sign * (1 + math.log(count)) * idf
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        if price is not None:
+            z = (math.log1p(float(price)) - self._price_mean) / self._price_std
+            vector[-1] = SIMILARITY_PRICE_WEIGHT * z
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _signatures(self, np, vectors):
+        bits = (vectors @ self._planes) > 0
+        weights = 1 << np.arange(LSH_BITS)
+        # (n, tables * bits) -> (n, tables) integer bucket keys
+        return bits.reshape(len(vectors), LSH_TABLES, LSH_BITS) @ weights
+
+    def _insert(self, np, property_id, vector):
+        position = self._positions.get(property_id)
+        if position is None:
+            position = len(self._ids)
+            if self._matrix is None or position == len(self._matrix):
+                grown = np.zeros((max(16, position * 2), SIMILARITY_DIMENSIONS + 1), dtype=np.float32)
+                if self._matrix is not None:
+                    grown[:position] = self._matrix[:position]
+                self._matrix = grown
+            self._ids.append(property_id)
+            self._positions[property_id] = position
+        else:
+            self._unbucket(np, position)
+        self._matrix[position] = vector
+        for table, key in zip(self._tables, self._signatures(np, vector[None, :])[0]):
+            table.setdefault(int(key), []).append(position)
+
+    def _unbucket(self, np, position):
+        keys = self._signatures(np, self._matrix[position][None, :])[0]
+        for table, key in zip(self._tables, keys):
+            bucket = table.get(int(key), [])
+            if position in bucket:
+                bucket.remove(position)
+
+    def load(self, rows, facility_names):
+        """Index ``rows``; ``facility_names`` maps property id -> facility names."""
+        np = _numpy()
+        if self._planes is None:
+            rng = np.random.default_rng(LSH_SEED)
+            self._planes = rng.standard_normal((SIMILARITY_DIMENSIONS + 1, LSH_TABLES * LSH_BITS)).astype(np.float32)
+
+        analyzed = [(row, _features(row, facility_names.get(row["id"], ()))) for row in rows]
+        document_frequency = {}
+        for _, counts in analyzed:
+            for term in counts:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        prices = [math.log1p(float(row["price_per_night"])) for row in rows if row.get("price_per_night") is not None]
+
+        with self._lock:
+            self._reset()
+            self._document_frequency = document_frequency
+            self._doc_count = len(rows)
+            if prices:
+                self._price_mean = sum(prices) / len(prices)
+                self._price_std = math.sqrt(sum((p - self._price_mean) ** 2 for p in prices) / len(prices)) or 1.0
+            vectors = np.array(
+                [self._vector(np, counts, row.get("price_per_night")) for row, counts in analyzed],
+                dtype=np.float32,
+            ).reshape(len(analyzed), SIMILARITY_DIMENSIONS + 1)
+            self._matrix = vectors
+            self._ids = [row["id"] for row, _ in analyzed]
+            self._positions = {property_id: i for i, property_id in enumerate(self._ids)}
+            for position, keys in enumerate(self._signatures(np, vectors)):
+                for table, key in zip(self._tables, keys):
+                    table.setdefault(int(key), []).append(position)
+            self._mark_loaded()
+
+    def _load(self):
+        rows = fetch_all(
+            lambda: supabase.table("properties")
+            .select("id, title, description, category_id, price_per_night")
+            .order("id")
+        )
+        links = fetch_all(
+            lambda: supabase.table("property_facilities")
+            .select("property_id, facility_id")
+            .order("id")
+        )
+        self.load(rows, self._facility_names(links))
+
+    @staticmethod
+    def _facility_names(links):
+        names = {}
+        for link in links:
+            name = facilities.name_for(link["facility_id"])
+            if name:
+                names.setdefault(link["property_id"], []).append(name)
+        return names
+
+    def add(self, row, facility_ids=()):
+        """Index one listing (new or changed) with the current IDF weights."""
+        if not self.loaded:
+            return
+        np = _numpy()
+        names = [name for name in map(facilities.name_for, facility_ids) if name]
+        counts = _features(row, names)
+        with self._lock:
+            self._insert(np, row["id"], self._vector(np, counts, row.get("price_per_night")))
+
+    def _fetch(self, property_id):
+        """Index a listing written by another worker since the last build."""
+        rows = fetch_in("properties", "id, title, description, category_id, price_per_night", "id", [property_id])
+        if not rows:
+            return False
+        links = fetch_in("property_facilities", "property_id, facility_id", "property_id", [property_id])
+        self.add(rows[0], [link["facility_id"] for link in links])
+        return True
+
+    # -- querying
+
+    def similar(self, property_id, k=6):
+        """Return ``[(property_id, similarity)]`` for the ``k`` closest listings,
+        or None when ``property_id`` does not exist."""
+        np = _numpy()
+        self._ensure_fresh()
+        if property_id not in self._positions and not self._fetch(property_id):
+            return None
+
+        with self._lock:
+            position = self._positions[property_id]
+            matrix, ids = self._matrix, self._ids
+            query = matrix[position]
+            keys = self._signatures(np, query[None, :])[0]
+            candidates = set()
+            for table, key in zip(self._tables, keys):
+                candidates.update(table.get(int(key), ()))
+            # Multi-probe: buckets one hyperplane away
+            if len(candidates) < MIN_CANDIDATES:
+                for table, key in zip(self._tables, keys):
+                    for bit in range(LSH_BITS):
+                        candidates.update(table.get(int(key) ^ (1 << bit), ()))
+
+        candidates.discard(position)
+        if len(candidates) < k:
+            # Too sparse for LSH to find k neighbours; scan everything
+            candidates = np.delete(np.arange(len(ids)), position)
+        else:
+            candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        if not len(candidates):
+            return []
+
+        scores = matrix[candidates] @ query
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[candidates[i]], round(float(scores[i]), 4)) for i in top]
+
+
+similarity_index = SimilarityIndex()
@@ -1,10 +1,133 @@
-from supabase import create_client
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import threading
+from services.instrumentation import instrument_httpx_client
+from services.resilience import UpstreamUnavailable, resilient_transport
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_KEEPALIVE_CONNECTIONS", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3"))
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "false").lower() == "true"
+SUPABASE_CLIENT_PER_THREAD = os.getenv("SUPABASE_CLIENT_PER_THREAD", "false").lower() == "true"
+SUPABASE_WARM_CONNECTIONS = int(os.getenv("SUPABASE_WARM_CONNECTIONS", "2"))
+
+
+class SupabaseClient:
+    """Hands out Supabase clients that are safe across forks and threads.
+
+    Each process lazily builds one keep-alive HTTP connection pool and one
+    client on top of it; after a fork the child builds its own instead of
+    reusing sockets inherited from the parent. With
+    SUPABASE_CLIENT_PER_THREAD=true every thread gets its own client (and
+    so its own auth session state) over the same process-wide pool. The
+    supabase and httpx packages are only imported when the first client is
+    built.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _http = None
+    _client = None
+    _local = threading.local()
+    url = SUPABASE_URL
+    key = SUPABASE_KEY
+
+    @classmethod
+    def configure(cls, url, key):
+        with cls._lock:
+            cls.url = url
+            cls.key = key
+            cls._client = None
+            cls._local = threading.local()
+
+    @classmethod
+    def _ensure_process_state(cls):
+        if cls._pid == os.getpid():
+            return
+        with cls._lock:
+            if cls._pid == os.getpid():
+                return
+            import httpx
+
+            # Inherited connections belong to the parent; drop, don't close.
+            transport = httpx.HTTPTransport(
+                http2=SUPABASE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_POOL_SIZE,
+                    max_keepalive_connections=SUPABASE_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+                ),
+            )
+            cls._http = instrument_httpx_client(
+                httpx.Client(
+                    # Breaker, request deadline and retries for reads
+                    transport=resilient_transport(transport, "supabase"),
+                    timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+                ),
+                "supabase",
+            )
+            cls._client = None
+            cls._local = threading.local()
+            cls._pid = os.getpid()
+
+    @classmethod
+    def _build_client(cls):
+        from supabase import ClientOptions, create_client
+
+        return create_client(
+            cls.url,
+            cls.key,
+            options=ClientOptions(httpx_client=cls._http),
+        )
+
+    def http_client(self):
+        self._ensure_process_state()
+        return self._http
+
+    def get_client(self):
+        self._ensure_process_state()
+        if SUPABASE_CLIENT_PER_THREAD:
+            client = getattr(self._local, "client", None)
+            if client is None:
+                client = self._local.client = self._build_client()
+            return client
+
+        cls = type(self)
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = self._build_client()
+        return cls._client
+
+    def warm_up(self, connections=SUPABASE_WARM_CONNECTIONS):
+        """Open keep-alive connections before the first request needs them."""
+        import httpx
+
+        http = self.http_client()
+        self.get_client()
+
+        def ping():
+            try:
+                http.get(f"{self.url}/rest/v1/", headers={"apikey": self.key})
+            except (httpx.HTTPError, UpstreamUnavailable):
+                pass
+
+        threads = [threading.Thread(target=ping) for _ in range(max(connections, 0))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+class _ClientProxy:
+    """Module-level ``supabase`` that resolves to the current process/thread client."""
+
+    def __getattr__(self, name):
+        return getattr(SupabaseClient().get_client(), name)
+
+
+supabase = _ClientProxy()
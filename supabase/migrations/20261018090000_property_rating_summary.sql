@@ -0,0 +1,79 @@
+-- Per-property rating aggregates, maintained incrementally by a trigger on
+-- reviews so list endpoints can read average_rating without scanning reviews.
+
+create table if not exists public.property_rating_summary (
+    property_id uuid primary key references public.properties (id) on delete cascade,
+    rating_sum bigint not null default 0,
+    review_count integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+-- Readable by everyone; the trigger below is the only writer.
+alter table public.property_rating_summary enable row level security;
+revoke insert, update, delete, truncate on table public.property_rating_summary from anon, authenticated;
+drop policy if exists "Rating summaries are readable by everyone" on public.property_rating_summary;
+create policy "Rating summaries are readable by everyone"
+    on public.property_rating_summary
+    for select
+    to anon, authenticated
+    using (true);
+
+-- security definer: reviews written by API clients must still update the
+-- summary, which they cannot write to themselves.
+create or replace function public.apply_review_to_rating_summary()
+returns trigger
+language plpgsql
+security definer
+set search_path = ''
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.rating is not null then
+        update public.property_rating_summary
+           set rating_sum = rating_sum - old.rating,
+               review_count = review_count - 1,
+               updated_at = now()
+         where property_id = old.property_id;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') and new.rating is not null then
+        insert into public.property_rating_summary as s (property_id, rating_sum, review_count)
+        values (new.property_id, new.rating, 1)
+        on conflict (property_id) do update
+            set rating_sum = s.rating_sum + excluded.rating_sum,
+                review_count = s.review_count + 1,
+                updated_at = now();
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists reviews_rating_summary on public.reviews;
+create trigger reviews_rating_summary
+after insert or update of rating, property_id or delete on public.reviews
+for each row execute function public.apply_review_to_rating_summary();
+
+-- Full recomputation for backfills; returns the number of properties summarised.
+create or replace function public.rebuild_property_rating_summary()
+returns integer
+language plpgsql
+as $$
+declare
+    summarised integer;
+begin
+    lock table public.property_rating_summary in exclusive mode;
+    delete from public.property_rating_summary;
+    insert into public.property_rating_summary (property_id, rating_sum, review_count)
+    select property_id, sum(rating), count(rating)
+      from public.reviews
+     where rating is not null
+     group by property_id;
+    get diagnostics summarised = row_count;
+    return summarised;
+end;
+$$;
+
+revoke execute on function public.rebuild_property_rating_summary() from public, anon, authenticated;
+grant execute on function public.rebuild_property_rating_summary() to service_role;
+
+select public.rebuild_property_rating_summary();
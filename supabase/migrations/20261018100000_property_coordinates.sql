@@ -0,0 +1,14 @@
+-- Coordinates for radius / nearest-first search. Filled from the offline
+-- gazetteer when listings are created or ingested; backfill existing rows
+-- with `flask geocode-properties`.
+
+alter table public.properties
+    add column if not exists latitude double precision,
+    add column if not exists longitude double precision;
+
+alter table public.properties
+    drop constraint if exists properties_coordinates_check,
+    add constraint properties_coordinates_check check (
+        (latitude is null and longitude is null)
+        or (latitude between -90 and 90 and longitude between -180 and 180)
+    );
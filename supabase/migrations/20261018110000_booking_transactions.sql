@@ -0,0 +1,185 @@
+-- Booking and payment writes as single-round-trip transactions, with
+-- Idempotency-Key replay stored next to the rows they produced.
+
+create table if not exists public.idempotency_keys (
+    scope text not null,
+    owner text not null default '',
+    key text not null,
+    request_hash text,
+    response jsonb not null,
+    created_at timestamptz not null default now(),
+    primary key (scope, owner, key)
+);
+
+create index if not exists idempotency_keys_created_at_idx
+    on public.idempotency_keys (created_at);
+
+-- Stored responses belong to other users: only the API server (service role,
+-- which bypasses RLS) reads or writes them. No policies, so PostgREST clients
+-- see nothing.
+alter table public.idempotency_keys enable row level security;
+revoke all on table public.idempotency_keys from anon, authenticated;
+
+-- Insert a booking (and, when a payment method is given, its payment) after
+-- checking the stay does not overlap an active booking. Returns
+-- {"status": "created" | "replayed" | "conflict" | "key_mismatch", ...}.
+create or replace function public.create_booking(
+    p_user_id uuid,
+    p_property_id uuid,
+    p_check_in date,
+    p_check_out date,
+    p_guests integer,
+    p_amount_paid numeric,
+    p_payment_method text default null,
+    p_idempotency_key text default null,
+    p_request_hash text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    stored public.idempotency_keys;
+    new_booking public.bookings;
+    new_payment public.payments;
+    result jsonb;
+begin
+    if p_idempotency_key is not null then
+        -- Serialise concurrent requests carrying the same key.
+        perform pg_advisory_xact_lock(hashtextextended('book:' || p_user_id || ':' || p_idempotency_key, 0));
+        select * into stored
+          from public.idempotency_keys
+         where scope = 'book' and owner = p_user_id::text and key = p_idempotency_key;
+        if found then
+            if stored.request_hash is distinct from p_request_hash then
+                return jsonb_build_object('status', 'key_mismatch');
+            end if;
+            return stored.response || jsonb_build_object('status', 'replayed');
+        end if;
+    end if;
+
+    -- Serialise bookings per property so the overlap check cannot race.
+    perform 1 from public.properties where id = p_property_id for update;
+
+    if exists (
+        select 1
+          from public.bookings
+         where property_id = p_property_id
+           and lower(coalesce(status, '')) not in ('cancelled', 'canceled', 'refunded')
+           and check_in < p_check_out
+           and check_out > p_check_in
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    if p_payment_method is null then
+        -- status and payment_date keep their column defaults
+        insert into public.bookings (
+            user_id, property_id, check_in, check_out, guests, amount_paid, payment_status
+        )
+        values (
+            p_user_id, p_property_id, p_check_in, p_check_out, p_guests, p_amount_paid, 'paid'
+        )
+        returning * into new_booking;
+    else
+        insert into public.bookings (
+            user_id, property_id, check_in, check_out, guests, amount_paid,
+            payment_status, status, payment_date
+        )
+        values (
+            p_user_id, p_property_id, p_check_in, p_check_out, p_guests, p_amount_paid,
+            'paid', 'confirmed', now()
+        )
+        returning * into new_booking;
+
+        insert into public.payments (booking_id, amount, method, status)
+        values (new_booking.id, p_amount_paid, p_payment_method, 'completed')
+        returning * into new_payment;
+    end if;
+
+    result := jsonb_build_object(
+        'booking', to_jsonb(new_booking),
+        'payment', case when new_payment.id is null then null else to_jsonb(new_payment) end
+    );
+
+    if p_idempotency_key is not null then
+        insert into public.idempotency_keys (scope, owner, key, request_hash, response)
+        values ('book', p_user_id::text, p_idempotency_key, p_request_hash, result);
+    end if;
+
+    return result || jsonb_build_object('status', 'created');
+end;
+$$;
+
+-- Confirm a booking of p_user_id and record its payment in one transaction.
+-- Bookings of other users are reported as not found. Returns
+-- {"status": "created" | "replayed" | "not_found" | "key_mismatch", ...}.
+create or replace function public.process_booking_payment(
+    p_user_id uuid,
+    p_booking_id uuid,
+    p_amount numeric,
+    p_payment_method text,
+    p_idempotency_key text default null,
+    p_request_hash text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    stored public.idempotency_keys;
+    updated_booking public.bookings;
+    new_payment public.payments;
+    result jsonb;
+begin
+    if p_idempotency_key is not null then
+        perform pg_advisory_xact_lock(hashtextextended('payment:' || p_user_id || ':' || p_idempotency_key, 0));
+        select * into stored
+          from public.idempotency_keys
+         where scope = 'payment' and owner = p_user_id::text and key = p_idempotency_key;
+        if found then
+            if stored.request_hash is distinct from p_request_hash then
+                return jsonb_build_object('status', 'key_mismatch');
+            end if;
+            return stored.response || jsonb_build_object('status', 'replayed');
+        end if;
+    end if;
+
+    update public.bookings
+       set status = 'confirmed',
+           payment_status = 'paid',
+           payment_date = now()
+     where id = p_booking_id
+       and user_id = p_user_id
+    returning * into updated_booking;
+
+    if not found then
+        return jsonb_build_object('status', 'not_found');
+    end if;
+
+    insert into public.payments (booking_id, amount, method, status)
+    values (p_booking_id, p_amount, p_payment_method, 'completed')
+    returning * into new_payment;
+
+    result := jsonb_build_object(
+        'booking', to_jsonb(updated_booking),
+        'payment', to_jsonb(new_payment)
+    );
+
+    if p_idempotency_key is not null then
+        insert into public.idempotency_keys (scope, owner, key, request_hash, response)
+        values ('payment', p_user_id::text, p_idempotency_key, p_request_hash, result);
+    end if;
+
+    return result || jsonb_build_object('status', 'created');
+end;
+$$;
+
+-- The RPCs trust p_user_id, which the API server takes from the verified
+-- token, so clients must not call them directly.
+revoke execute on function public.create_booking(uuid, uuid, date, date, integer, numeric, text, text, text)
+    from public, anon, authenticated;
+revoke execute on function public.process_booking_payment(uuid, uuid, numeric, text, text, text)
+    from public, anon, authenticated;
+grant execute on function public.create_booking(uuid, uuid, date, date, integer, numeric, text, text, text)
+    to service_role;
+grant execute on function public.process_booking_payment(uuid, uuid, numeric, text, text, text)
+    to service_role;
@@ -0,0 +1,26 @@
+-- Change tracking for the in-process catalogue replica, which polls for
+-- rows with updated_at at or after the newest one it has seen.
+
+alter table public.properties
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists properties_touch_updated_at on public.properties;
+create trigger properties_touch_updated_at
+before update on public.properties
+for each row execute function public.touch_updated_at();
+
+create index if not exists properties_updated_at_idx
+    on public.properties (updated_at, id);
+
+create index if not exists property_rating_summary_updated_at_idx
+    on public.property_rating_summary (updated_at, property_id);
@@ -1,22 +1,157 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
 from functools import wraps
+
+import jwt
 from flask import request, jsonify
 from services.supabase_client import supabase
+from utils.ttl_cache import TTLCache
+
+# Set from the app's Config by configure()
+SUPABASE_JWT_SECRET = None
+SUPABASE_JWKS_URL = None
+SUPABASE_JWT_AUDIENCE = "authenticated"
+AUTH_VERIFY_MODE = "local"
+AUTH_REMOTE_FALLBACK = False
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+
+_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_jwks_client = None
+
+
+@dataclass
+class AuthUser:
+    id: str
+    email: str | None = None
+    phone: str | None = None
+    role: str | None = None
+    user_metadata: dict = field(default_factory=dict)
+    app_metadata: dict = field(default_factory=dict)
+
+
+def configure(supabase_url=None, jwt_secret=None, jwks_url=None, audience="authenticated",
+              verify_mode="local", remote_fallback=False):
+    global SUPABASE_JWT_SECRET, SUPABASE_JWKS_URL, SUPABASE_JWT_AUDIENCE
+    global AUTH_VERIFY_MODE, AUTH_REMOTE_FALLBACK, _jwks_client
+    SUPABASE_JWT_SECRET = jwt_secret
+    SUPABASE_JWKS_URL = jwks_url or (
+        f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+    )
+    SUPABASE_JWT_AUDIENCE = audience
+    AUTH_VERIFY_MODE = verify_mode
+    AUTH_REMOTE_FALLBACK = remote_fallback
+    _jwks_client = None
+    _user_cache.clear()
+
+
+def get_bearer_token():
+    auth_header = request.headers.get("Authorization", "")
+    scheme, _, token = auth_header.partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token or " " in token:
+        return None
+    return token
+
+
+def _get_jwks_client():
+    global _jwks_client
+    if _jwks_client is None:
+        _jwks_client = jwt.PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True)
+    return _jwks_client
+
+
+def _decode_locally(token):
+    # The header only picks the key source; the accepted algorithm comes
+    # from our side (the shared secret, or the algorithm of the JWKS key).
+    if jwt.get_unverified_header(token).get("alg") == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise jwt.InvalidTokenError("SUPABASE_JWT_SECRET is not configured")
+        key, algorithm = SUPABASE_JWT_SECRET, "HS256"
+    else:
+        if not SUPABASE_JWKS_URL:
+            raise jwt.InvalidTokenError("No JWKS URL configured")
+        signing_key = _get_jwks_client().get_signing_key_from_jwt(token)
+        key, algorithm = signing_key.key, signing_key.algorithm_name
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=SUPABASE_JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]},
+    )
+    user = AuthUser(
+        id=claims["sub"],
+        email=claims.get("email"),
+        phone=claims.get("phone"),
+        role=claims.get("role"),
+        user_metadata=claims.get("user_metadata") or {},
+        app_metadata=claims.get("app_metadata") or {},
+    )
+    return user, claims["exp"]
+
+
+def _fetch_remotely(token):
+    user_response = supabase.auth.get_user(token)
+    if not user_response or not user_response.user:
+        return None, None
+    try:
+        expires_at = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        expires_at = None
+    return user_response.user, expires_at
+
+
+def verify_token(token):
+    """Return the user for ``token`` or None, caching results until expiry."""
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    user = _user_cache.get(cache_key)
+    if user is not None:
+        return user
+
+    user, expires_at = None, None
+    if AUTH_VERIFY_MODE == "local":
+        try:
+            user, expires_at = _decode_locally(token)
+        except jwt.ExpiredSignatureError:
+            return None
+        except jwt.PyJWTError:
+            if not AUTH_REMOTE_FALLBACK:
+                return None
+    if user is None:
+        try:
+            user, expires_at = _fetch_remotely(token)
+        except Exception:
+            return None
+        if user is None:
+            return None
+
+    ttl = AUTH_CACHE_TTL
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    _user_cache.set(cache_key, user, ttl=ttl)
+    return user
+
 
 def require_auth(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
+        if not request.headers.get("Authorization"):
             return jsonify({"error": "Missing authorization header"}), 401
 
-        token = auth_header.split(" ")[1]
-        user_response = supabase.auth.get_user(token)
+        token = get_bearer_token()
+        if not token:
+            return jsonify({"error": "Malformed authorization header"}), 401
 
-        if not user_response or not user_response.user:
+        user = verify_token(token)
+        if user is None:
             return jsonify({"error": "Invalid or expired token"}), 401
 
         # ✅ Attach the actual user object
-        request.user = user_response.user
+        request.user = user
         return func(*args, **kwargs)
     return wrapper
-
@@ -0,0 +1,85 @@
+import gzip
+import os
+
+from flask import request
+from utils.ttl_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE", "256"))
+COMPRESS_CACHE_TTL = float(os.getenv("COMPRESS_CACHE_TTL", "30"))
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Responses from cached_response repeat the same body (and ETag), so
+# their compressed form is kept too, per encoding.
+_compressed = TTLCache(maxsize=COMPRESS_CACHE_SIZE, ttl=COMPRESS_CACHE_TTL)
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _compressible(response):
+    if response.mimetype in COMPRESSIBLE_MIMETYPES:
+        return True
+    return response.mimetype.startswith("text/") or response.mimetype.endswith("+json")
+
+
+def compress_response(response):
+    """Encode large text bodies with the best of br/gzip the client accepts."""
+    if response.is_streamed or response.direct_passthrough:
+        return response
+    if not 200 <= response.status_code < 300 or response.status_code == 204:
+        return response
+    if "Content-Encoding" in response.headers or not _compressible(response):
+        return response
+    if response.mimetype == "text/event-stream":
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    # Vary whenever the representation could depend on Accept-Encoding
+    response.vary.add("Accept-Encoding")
+
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    key = (etag, encoding) if etag else None
+    compressed = _compressed.get(key) if key else None
+    if compressed is None:
+        compressed = _compress(body, encoding)
+        if key:
+            _compressed.set(key, compressed)
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    response.content_length = len(compressed)
+    # Same resource, different bytes: only weakly equal to the identity body
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
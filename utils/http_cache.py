@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, request
+from utils.ttl_cache import TTLCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Recomputed per response (or per request by after_request hooks), so never
+# stored with a response that is replayed later
+_SKIP_HEADERS = {"content-length", "set-cookie", "server-timing"}
+
+_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+class _CachedResponse:
+    __slots__ = ("body", "mimetype", "etag", "last_modified")
+
+    def __init__(self, body, mimetype, etag, last_modified):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+def invalidate(*tags):
+    """Drop every cached response tagged with any of ``tags``."""
+    with _generations_lock:
+        for tag in tags:
+            _generations[tag] = _generations.get(tag, 0) + 1
+
+
+def normalized_query():
+    """The query string with its arguments sorted, for use in cache keys."""
+    return "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+
+
+def replayable_headers(response):
+    """``response``'s headers minus those that must be recomputed on replay."""
+    return [(k, v) for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS]
+
+
+def _cache_key(tags):
+    generations = tuple(_generations.get(tag, 0) for tag in tags)
+    return (request.path, normalized_query(), generations)
+
+
+def cached_response(tags=(), max_age=30, ttl=None, cache_control=None):
+    """Cache a public GET view in process and answer conditional requests.
+
+    Successful, non-streamed responses are stored per path and normalized
+    query string for ``ttl`` seconds (RESPONSE_CACHE_TTL by default) and
+    served with an ETag, Last-Modified and ``Cache-Control`` (``public,
+    max-age=<max_age>`` unless ``cache_control`` is given). ``invalidate()``
+    with one of ``tags`` evicts them after a write.
+    """
+    header = cache_control or f"public, max-age={max_age}"
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = _cache_key(tags)
+            entry = _cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = _CachedResponse(
+                    body,
+                    response.mimetype,
+                    hashlib.sha1(body).hexdigest(),
+                    datetime.now(timezone.utc).replace(microsecond=0),
+                )
+                _cache.set(key, entry, ttl=ttl)
+
+            response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            response.last_modified = entry.last_modified
+            response.headers["Cache-Control"] = header
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
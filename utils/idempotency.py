@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from utils.ttl_cache import TTLCache
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "4096"))
+IDEMPOTENCY_CACHE_TTL = float(os.getenv("IDEMPOTENCY_CACHE_TTL", "86400"))
+
+# Outcomes a retry would get again. Handlers report upstream failures as 400,
+# so other client errors (and all server errors) are not stored.
+FINAL_STATUSES = {404, 409, 422}
+
+_responses = TTLCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_CACHE_TTL)
+# Striped locks so concurrent retries of one key run the handler once.
+_locks = [threading.Lock() for _ in range(64)]
+
+
+class _StoredResponse:
+    __slots__ = ("fingerprint", "body", "status", "mimetype")
+
+    def __init__(self, fingerprint, body, status, mimetype):
+        self.fingerprint = fingerprint
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def key_mismatch_response():
+    return jsonify({"error": f"{IDEMPOTENCY_HEADER} was already used with a different request"}), 422
+
+
+def mark_replayed(response):
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(scope, owner=None):
+    """Replay the stored response for a repeated ``Idempotency-Key``.
+
+    Responses are kept per worker in a TTL cache. The handler also gets the
+    key and a request fingerprint on ``request.idempotency_key`` /
+    ``request.request_hash`` to pass to the database, which stores the
+    result in the same transaction as the write, so a retry that lands on
+    another worker is still answered from the stored result.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            request.idempotency_key = None
+            request.request_hash = None
+
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return func(*args, **kwargs)
+            key = key.strip()
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+            fingerprint = _fingerprint()
+            cache_key = (scope, owner() if owner else "", key)
+            with _locks[hash(cache_key) % len(_locks)]:
+                stored = _responses.get(cache_key)
+                if stored is not None:
+                    if stored.fingerprint != fingerprint:
+                        return key_mismatch_response()
+                    return mark_replayed(current_app.response_class(
+                        stored.body, status=stored.status, mimetype=stored.mimetype
+                    ))
+
+                request.idempotency_key = key
+                request.request_hash = fingerprint
+                response = current_app.make_response(func(*args, **kwargs))
+
+                final = 200 <= response.status_code < 300 or response.status_code in FINAL_STATUSES
+                if final and not response.is_streamed:
+                    _responses.set(cache_key, _StoredResponse(
+                        fingerprint, response.get_data(), response.status_code, response.mimetype
+                    ))
+                return response
+        return wrapper
+    return decorator
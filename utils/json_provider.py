@@ -0,0 +1,53 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib provider is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Produces the same JSON as the default provider: keys sorted, dates as
+    HTTP dates, and Decimal, UUID and dataclasses through the same ``default``.
+    Anything orjson rejects (e.g. integers over 64 bits) falls back to the
+    stdlib encoder.
+    """
+
+    _options = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    ) if orjson is not None else 0
+
+    def _encode(self, obj, indent=False):
+        options = self._options | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=self.default, option=options)
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        encoded = self._encode(obj)
+        return encoded.decode() if encoded is not None else super().dumps(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._encode(obj, indent)
+        if body is None:
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def provider_class(name="auto"):
+    """``orjson``, ``stdlib`` or ``auto`` (orjson when installed)."""
+    if name == "stdlib" or (name == "auto" and orjson is None):
+        return DefaultJSONProvider
+    if orjson is None:
+        raise ValueError("JSON_PROVIDER=orjson but orjson is not installed")
+    return OrjsonProvider
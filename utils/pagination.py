@@ -0,0 +1,138 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from flask import Response, stream_with_context
+from flask import json as flask_json
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+STREAM_BATCH_SIZE = 200
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Both values end up inside a PostgREST filter string (apply_keyset),
+        # so accept only a real timestamp and uuid.
+        datetime.fromisoformat(created_at)
+        row_id = str(uuid.UUID(row_id))
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidPageRequest("Invalid cursor")
+    return created_at, row_id
+
+
+def encode_offset_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor):
+    """Cursors over relevance-ranked results are positions, not keys."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidPageRequest("Invalid cursor")
+    if offset < 0:
+        raise InvalidPageRequest("Invalid cursor")
+    return offset
+
+
+def is_paginated(args):
+    return "limit" in args or "cursor" in args
+
+
+def wants_stream(args):
+    return args.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def parse_page_args(args):
+    try:
+        limit = int(args.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise InvalidPageRequest("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise InvalidPageRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    cursor = args.get("cursor")
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def parse_offset_page_args(args):
+    limit, _ = parse_page_args({"limit": args.get("limit", DEFAULT_LIMIT)})
+    cursor = args.get("cursor")
+    return limit, decode_offset_cursor(cursor) if cursor else 0
+
+
+def apply_keyset(query, cursor):
+    """Order newest first on (created_at, id) and resume after ``cursor``."""
+    if cursor:
+        created_at, row_id = cursor
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+        )
+    return query.order("created_at", desc=True).order("id", desc=True)
+
+
+def fetch_page(build_query, limit, cursor=None, keep=None):
+    """Return ``(rows, next_cursor)`` for one keyset page.
+
+    ``keep`` filters rows in process (for exclusions too large to send to
+    PostgREST); further batches are fetched until the page is full.
+    """
+    if keep is None:
+        rows = apply_keyset(build_query(), cursor).limit(limit + 1).execute().data or []
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1])
+        return rows, None
+
+    rows = []
+    while True:
+        batch = apply_keyset(build_query(), cursor).limit(limit + 1).execute().data or []
+        for row in batch:
+            if not keep(row):
+                continue
+            if len(rows) == limit:
+                return rows, encode_cursor(rows[-1])
+            rows.append(row)
+        if len(batch) <= limit:
+            return rows, None
+        cursor = (batch[-1]["created_at"], batch[-1]["id"])
+
+
+def iter_pages(build_query, batch_size=STREAM_BATCH_SIZE):
+    cursor = None
+    while True:
+        rows = apply_keyset(build_query(), cursor).limit(batch_size).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def stream_json_array(pages, transform=None):
+    """Stream an iterable of row batches to the client as one JSON array."""
+
+    def generate():
+        first = True
+        yield "["
+        for rows in pages:
+            for row in transform(rows) if transform else rows:
+                yield ("" if first else ",") + flask_json.dumps(row)
+                first = False
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
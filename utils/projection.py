@@ -0,0 +1,44 @@
+import re
+
+MAX_FIELDS = 50
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(args, allowed=None):
+    """Parse ``fields=a,b,c`` into a tuple, or None when not given.
+
+    Names must be plain column identifiers and, when ``allowed`` is given,
+    one of those; anything else is rejected rather than passed to PostgREST.
+    """
+    raw = args.get("fields")
+    if raw is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    if not fields:
+        raise InvalidFields("fields must name at least one field")
+    if len(fields) > MAX_FIELDS:
+        raise InvalidFields(f"fields accepts at most {MAX_FIELDS} names")
+    invalid = [
+        name for name in fields
+        if not _IDENTIFIER.match(name) or (allowed is not None and name not in allowed)
+    ]
+    if invalid:
+        raise InvalidFields(f"Unknown fields: {', '.join(invalid)}")
+    return fields
+
+
+def select_columns(fields, required=()):
+    """PostgREST ``select`` for ``fields`` plus columns the handler itself needs."""
+    if fields is None:
+        return "*"
+    return ", ".join(dict.fromkeys((*required, *fields)))
+
+
+def project(rows, fields):
+    if fields is None:
+        return rows
+    return [{field: row.get(field) for field in fields} for row in rows]
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+from functools import wraps
+
+from flask import current_app, request
+from utils.http_cache import normalized_query, replayable_headers
+
+SINGLEFLIGHT_WAIT = float(os.getenv("SINGLEFLIGHT_WAIT", "10"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """Run one computation per key at a time and share it with duplicates.
+
+    Nothing is kept once the leading call returns, so a request that
+    arrives afterwards always computes fresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counts = {"leaders": 0, "shared": 0, "timeouts": 0, "fallbacks": 0}
+
+    def _incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts, in_flight=len(self._calls))
+
+    def do(self, key, fn, timeout=SINGLEFLIGHT_WAIT):
+        """Return ``(result, shared)``.
+
+        Duplicates wait up to ``timeout`` for the leader; if it is slower, or
+        fails, or produces no shareable result (None), they run ``fn``
+        themselves.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counts["leaders"] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result, False
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            self._incr("timeouts")
+            return fn(), False
+        if call.failed or call.result is None:
+            self._incr("fallbacks")
+            return fn(), False
+        self._incr("shared")
+        return call.result, True
+
+
+flights = SingleFlight()
+
+
+def request_signature():
+    """Method, path, sorted query args and canonical JSON body."""
+    body = request.get_json(silent=True) if request.is_json else None
+    payload = json.dumps(body, sort_keys=True, separators=(",", ":")) if body is not None else ""
+    digest = hashlib.sha1(payload.encode()).hexdigest() if payload else ""
+    return (request.method, request.path, normalized_query(), digest)
+
+
+def coalesce(key=request_signature, timeout=SINGLEFLIGHT_WAIT, skip=None):
+    """Share one view execution among identical concurrent requests.
+
+    ``key`` builds the request signature; ``skip`` returns True for requests
+    that must not be coalesced. Only complete, non-5xx responses are
+    shared, and each waiter gets its own Response built from the leader's
+    status, headers and body.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if skip is not None and skip():
+                return func(*args, **kwargs)
+
+            leader_response = []
+
+            def compute():
+                response = current_app.make_response(func(*args, **kwargs))
+                leader_response.append(response)
+                # Failures and streams are not shared; waiters run their own
+                if response.is_streamed or response.status_code >= 500:
+                    return None
+                return response.status_code, replayable_headers(response), response.get_data()
+
+            result, _ = flights.do((func.__name__, key()), compute, timeout)
+            if leader_response:
+                return leader_response[0]
+            status, headers, body = result
+            return current_app.response_class(body, status=status, headers=headers)
+        return wrapper
+    return decorator
@@ -0,0 +1,58 @@
+import os
+import time
+from functools import wraps
+
+from flask import current_app
+from services.resilience import UpstreamUnavailable, breaker_for, unavailable_response, upstream_failed
+from utils.http_cache import replayable_headers
+from utils.singleflight import request_signature
+from utils.ttl_cache import TTLCache
+
+STALE_CACHE_SIZE = int(os.getenv("STALE_CACHE_SIZE", "512"))
+# How long a last good response may stand in for a failing upstream
+STALE_MAX_AGE = float(os.getenv("STALE_MAX_AGE", "3600"))
+
+_last_good = TTLCache(maxsize=STALE_CACHE_SIZE, ttl=STALE_MAX_AGE)
+
+
+def serve_stale(key=request_signature, dependencies=("supabase",)):
+    """Fall back to the last good response when an upstream fails.
+
+    Successful, non-streamed responses are remembered per ``key()``. If the
+    view then fails after an upstream call failed, timed out or was refused
+    by an open breaker, the remembered response is served with
+    ``Warning: 110`` and ``X-Stale``; without one the client gets a 503
+    and a Retry-After instead of the view's own error.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            signature = (view.__name__, key())
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+            except UpstreamUnavailable:
+                pass
+            else:
+                if response.is_streamed:
+                    return response
+                if response.status_code == 200:
+                    _last_good.set(signature, (time.time(), replayable_headers(response), response.get_data()))
+                    return response
+                if response.status_code < 400 or not upstream_failed():
+                    return response
+
+            entry = _last_good.get(signature)
+            if entry is None:
+                retry_after = max((breaker_for(name).retry_after() for name in dependencies), default=0)
+                return unavailable_response("Service temporarily unavailable, please retry", retry_after)
+
+            stored_at, headers, body = entry
+            stale = current_app.response_class(body, status=200, headers=headers)
+            stale.headers["Age"] = str(int(time.time() - stored_at))
+            stale.headers["Warning"] = '110 - "Response is Stale"'
+            stale.headers["X-Stale"] = "true"
+            stale.headers["Cache-Control"] = "no-store"
+            return stale
+        return wrapper
+    return decorator